@@ -0,0 +1,51 @@
+"""Synthetic MyBible modules for benchmarks"""
+import random
+import sqlite3
+from pathlib import Path
+
+BOOKS = [
+    (10, "1Móz", "Mózes első könyve", 50), (20, "2Móz", "Mózes második könyve", 40),
+    (230, "Zsolt", "Zsoltárok", 150), (290, "Ézs", "Ézsaiás", 66), (470, "Mt", "Máté", 28),
+    (500, "Jn", "János", 21), (520, "Róm", "Rómaiakhoz", 16), (730, "Jel", "Jelenések", 22),
+]
+"""(book_number, short_name, long_name, chapters)"""
+
+WORDS = "és az Úr szólt mondta Mózesnek Istennek őket ügyében lélek szeretet hit remény kegyelem világosság".split()
+
+class Book:
+    """Book row like database.bible.BibleInfo, without a module behind it"""
+    def __init__(self, id: int, short_name: str, long_name: str):
+        self.id = id
+        self.short_name = short_name
+        self.long_name = long_name
+
+    def get_full_name(self) -> str:
+        return f"({self.short_name}) {self.long_name}"
+
+def make_module(path: Path, seed: int = 0):
+    """Write a module with the books above, random verses and the usual MyBible markup"""
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE info (name TEXT, value TEXT);
+        CREATE TABLE books (book_color TEXT, book_number NUMERIC, short_name TEXT, long_name TEXT);
+        CREATE TABLE verses (book_number NUMERIC, chapter NUMERIC, verse NUMERIC, text TEXT);
+    """)
+    conn.execute("INSERT INTO info VALUES ('description', 'Benchmark fixture')")
+    for book_number, short_name, long_name, chapters in BOOKS:
+        conn.execute("INSERT INTO books VALUES ('#ffffff', ?, ?, ?)", (book_number, short_name, long_name))
+        for chapter in range(1, chapters + 1):
+            verse_count = 176 if (book_number, chapter) == (230, 119) else rng.randint(10, 40)
+            rows = []
+            for verse in range(1, verse_count + 1):
+                words = [rng.choice(WORDS) + (f"<S>{rng.randint(1, 9999)}</S>" if rng.random() < 0.3 else "")
+                         for _ in range(rng.randint(8, 40))]
+                text = " ".join(words)
+                if rng.random() < 0.2:
+                    text = f"<pb/>{text} <f>[1]</f> <i>{rng.choice(WORDS)}</i>"
+                rows.append((book_number, chapter, verse, text))
+            conn.executemany("INSERT INTO verses VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
@@ -0,0 +1,161 @@
+"""Latency from a list change to a repainted projection screen, headless
+
+python -m benchmarks.projection [--rounds 50] [--output results.json] [--resident]
+
+Runs the real main window against synthetic modules in a temporary data directory
+and prints p50/p99 per operation as JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.fixture import make_module
+
+MODULES = ["BENCHA", "BENCHB"]
+ROOT = Path(__file__).parent.parent
+
+def summary(timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "samples": len(timings),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50, help="samples per operation")
+    parser.add_argument("--output", type=Path, help="write the json here instead of stdout")
+    parser.add_argument("--resident", action="store_true", help="keep the opened modules in memory (PROJECTOR_RESIDENT)")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="projector-bench-"))
+    for seed, name in enumerate(MODULES):
+        make_module(data_dir / "books" / f"{name}.SQLite3", seed)
+    # Paths are read when utils.file_manager is imported, so this goes before any app import
+    os.environ["PROJECTOR_DATA_DIR"] = str(data_dir)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if args.resident:
+        os.environ["PROJECTOR_RESIDENT"] = "1"
+    os.chdir(ROOT)
+    try:
+        results = run(args.rounds)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+def run(rounds: int) -> dict:
+    from PySide6 import __version__ as pyside_version
+    from PySide6.QtCore import qVersion
+    from PySide6.QtWidgets import QApplication, QAbstractItemView, QLineEdit, QListWidget
+    app = QApplication(sys.argv)
+    from database import bible
+    from main import MainApp
+    from ui.render import render_pool
+
+    start = time.perf_counter()
+    app_window = MainApp()
+    startup_ms = (time.perf_counter() - start) * 1000
+    window = app_window.main_window
+    screen = app_window.second_window
+    # The modules are scanned once the event loop runs, the first one opens on a worker thread
+    app.processEvents()
+    if bible.opener is not None:
+        bible.opener.wait()
+    app.processEvents()
+    if bible.index_worker is not None:
+        bible.index_worker.wait()
+
+    book_view: QAbstractItemView = window.findChild(QAbstractItemView, "bookList") # type: ignore
+    chapter_view: QAbstractItemView = window.findChild(QAbstractItemView, "chapterList") # type: ignore
+    verse_view: QAbstractItemView = window.findChild(QAbstractItemView, "verseList") # type: ignore
+    bible_list: QListWidget = window.findChild(QListWidget, "bibleList") # type: ignore
+    book_edit: QLineEdit = window.findChild(QLineEdit, "bookEdit") # type: ignore
+    rng = random.Random(0)
+
+    def settle():
+        """Let background loaders finish, like the pause between two clicks"""
+        bible.prefetcher.pool.waitForDone()
+        render_pool.waitForDone()
+        app.processEvents()
+
+    def timed(action) -> float:
+        settle()
+        start = time.perf_counter()
+        action()
+        app.processEvents()
+        screen.repaint()
+        return (time.perf_counter() - start) * 1000
+
+    def select(view: QAbstractItemView, row: int):
+        view.setCurrentIndex(view.model().index(row, 0))
+
+    def select_verse_path():
+        select(book_view, 0)
+        select(chapter_view, 0)
+        select(verse_view, 0)
+
+    timings: dict[str, list[float]] = {name: [] for name in
+        ["book_select", "chapter_load", "verse_step", "translation_switch", "book_filter_keystroke"]}
+
+    select_verse_path()
+    for _ in range(rounds):
+        row = rng.randrange(book_view.model().rowCount())
+        timings["book_select"].append(timed(lambda: select(book_view, row)))
+
+    for _ in range(rounds):
+        row = rng.randrange(chapter_view.model().rowCount())
+        # Cold read: the chapter comes from the module, not from the prefetch cache
+        settle()
+        bible.chapter_cache.clear()
+        timings["chapter_load"].append(timed(lambda: select(chapter_view, row)))
+
+    select(chapter_view, 0)
+    for i in range(rounds):
+        row = (i + 1) % verse_view.model().rowCount()
+        timings["verse_step"].append(timed(lambda: select(verse_view, row)))
+
+    for i in range(rounds):
+        timings["translation_switch"].append(timed(lambda: bible_list.setCurrentRow((i + 1) % len(MODULES))))
+
+    window.activateWindow()
+    names = [bible.books[rng.randrange(len(bible.books))].short_name for _ in range(rounds)]
+    for name in names:
+        for end in range(1, len(name) + 1):
+            # A unique match moves the focus on to the next list, like typing does
+            book_edit.setFocus()
+            timings["book_filter_keystroke"].append(timed(lambda: book_edit.setText(name[:end])))
+        book_edit.clear()
+
+    app_window.second_window.close()
+    window.close()
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "qt": qVersion(),
+            "pyside": pyside_version,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "resident": os.environ.get("PROJECTOR_RESIDENT") == "1",
+            "screen": [screen.width(), screen.height()],
+        },
+        "rounds": rounds,
+        "startup_ms": round(startup_ms, 3),
+        "operations": {name: summary(values) for name, values in timings.items()},
+    }
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Per-keystroke latency of the reference bar parser
+
+python -m benchmarks.reference_parser
+"""
+import statistics
+import time
+from benchmarks.fixture import Book
+from database.reference import ALIASES, ReferenceIndex
+
+REFERENCES = ["Jn 3:16-18", "1 Móz 1,1", "Zsolt 119:105-112", "Róm 8:28-39", "Jel 22:21", "Ézs 53:5", "1Kor 13:4-7", "Mt 5:3"]
+
+def main(rounds: int = 200):
+    books = [Book(id, names[0].title(), names[-1].title()) for id, names in ALIASES.items()]
+    start = time.perf_counter()
+    index = ReferenceIndex(books)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings: list[float] = []
+    for _ in range(rounds):
+        for reference in REFERENCES:
+            for end in range(1, len(reference)+1):
+                start = time.perf_counter()
+                index.parse(reference[:end])
+                timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    print(f"index build: {build_ms:.2f} ms for {len(books)} books")
+    print(f"keystrokes: {len(timings)}")
+    print(f"p50: {statistics.median(timings):.1f} us  p99: {timings[int(len(timings) * 0.99)]:.1f} us  max: {timings[-1]:.1f} us")
+
+if __name__ == "__main__":
+    main()
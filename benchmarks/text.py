@@ -0,0 +1,84 @@
+"""Book filtering, query tokenizing and search index building on Hungarian text at growing corpus sizes
+
+python -m benchmarks.text [--scales 1 2 4 8]
+
+Time per item should stay flat while the corpus grows, ie. all of them scale linearly.
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from benchmarks.fixture import BOOKS, WORDS, Book, make_module
+from utils.text import clean_verse_text, tokens
+
+KEYSTROKES = ["z", "zs", "zso", "zsol", "zsolt", "zsolta", "zsoltar", "moz", "mózes", "jan", "jános", "ro", "római"]
+VERSES_PER_SCALE = 10000
+
+def verses(count: int, seed: int = 0) -> Iterator[str]:
+    """Verse texts with MyBible markup, generated one at a time like rows read from a module"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = " ".join(rng.choice(WORDS) + (f"<S>{rng.randint(1, 9999)}</S>" if rng.random() < 0.3 else "")
+                        for _ in range(rng.randint(8, 40)))
+        yield f"<pb/>{text} <f>[1]</f>" if rng.random() < 0.2 else text
+
+def bench_filter(scale: int) -> tuple[int, float]:
+    """Books filtered and ms for every keystroke, the book list repeated scale * 100 times"""
+    from ui.models import BookFilterModel, BookListModel
+    books = [Book(id * 1000 + copy, short_name, f"{long_name} {copy}")
+             for copy in range(scale * 100) for id, short_name, long_name, _ in BOOKS]
+    model = BookListModel()
+    model.set_books(books)
+    proxy = BookFilterModel(model)
+    start = time.perf_counter()
+    for text in KEYSTROKES:
+        proxy.set_text(text)
+        proxy.rowCount()
+    return len(books) * len(KEYSTROKES), (time.perf_counter() - start) * 1000
+
+def bench_tokenize(scale: int) -> tuple[int, float]:
+    """Words and ms for cleaning and tokenizing scale * VERSES_PER_SCALE streamed verses, the way query text is tokenized"""
+    start = time.perf_counter()
+    count = sum(1 for text in verses(scale * VERSES_PER_SCALE) for _ in tokens(clean_verse_text(text)))
+    return count, (time.perf_counter() - start) * 1000
+
+def bench_index(scale: int) -> tuple[int, float]:
+    """Verses and ms for building the search index of scale fixture modules, FTS5 tokenizes the verses itself"""
+    from database.search import build_index
+    from utils.file_manager import BOOKS_DIR, CACHE_DIR
+    names = [f"BENCH{i}" for i in range(scale)]
+    for seed, name in enumerate(names):
+        make_module(BOOKS_DIR / f"{name}.SQLite3", seed)
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    count = 0
+    for name in names:
+        with sqlite3.connect(BOOKS_DIR / f"{name}.SQLite3") as conn:
+            count += conn.execute("SELECT COUNT(*) FROM verses").fetchone()[0]
+    start = time.perf_counter()
+    for name in names:
+        build_index(name)
+    return count, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4, 8], help="corpus size multipliers")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="projector-bench-"))
+    # Paths are read when utils.file_manager is imported, so this goes before the index is built
+    os.environ["PROJECTOR_DATA_DIR"] = str(data_dir)
+    try:
+        for name, bench in [("filter", bench_filter), ("tokenize", bench_tokenize), ("index", bench_index)]:
+            for scale in args.scales:
+                items, ms = bench(scale)
+                print(f"{name} x{scale}: {items} items in {ms:.1f} ms, {ms * 1e6 / items:.0f} ns per item")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
 import sqlite3
-from pathlib import Path
+from collections.abc import Callable, Sequence
 from PySide6.QtWidgets import QApplication
-from PySide6.QtWidgets import QListWidget, QWidget, QLineEdit, QPushButton, QLabel, QHBoxLayout
+from PySide6.QtWidgets import QListView, QListWidget, QWidget, QLineEdit, QPushButton, QLabel, QHBoxLayout
 from PySide6.QtGui import QAction, QIntValidator
-from PySide6.QtCore import QObject, Qt, QEvent
+from PySide6.QtCore import QObject, Qt, QEvent, QTimer
+from ui.models import ID_ROLE, BookFilterModel, BookListModel, ChapterListModel, VerseListModel
 from ui.screen import ShowScreen
-from database.books_manager import init_books
-import re
-from utils.file_manager import find_books
+from database.books_manager import init_books, layout_books
+from database.catalog import ModuleCatalog
+from database.chapter_cache import ChapterCache, load_chapter
+from database.corpus import ResidentCorpus
+from database.parallel import ParallelVerses
+from database.prefetch import Prefetcher, close_cursors
+from database.reading import Reading, Slide, make_reading
+from database.reference import Reference, ReferenceIndex
+from database.registry import SIDECAR_BOOKS, ModuleOpener, ModuleRegistry
+from database.search import SEARCH_DELAY_MS, SearchEngine, SearchIndexWorker, SearchResult, is_indexed
+from playlist.history import HistoryEntry, VerseHistory
+from utils.trace import traced
 
 current_book: int = -1
 """Current book id"""
@@ -15,7 +25,46 @@ current_chapter: int = -1
 """Cuurent chapter row"""
 current_verse: int = -1
 """Cuurent verse row+1"""
-cursor: sqlite3.Cursor | None = None
+current_bible: str = ""
+"""Name of the opened module"""
+using_sidecar: bool = False
+"""The cursor points to the pre-cleaned sidecar instead of the module itself"""
+books_query = SIDECAR_BOOKS
+"""Book list query of the opened module"""
+catalog = ModuleCatalog()
+"""Installed modules, rescanned when the books directory changes"""
+chapter_cache = ChapterCache()
+
+def forget_module(name: str):
+    """The module's sidecar is being rebuilt, drop what was read from the old one"""
+    chapter_cache.invalidate(name)
+    close_cursors(name)
+
+modules = ModuleRegistry(on_rebuild=forget_module)
+prefetcher = Prefetcher(chapter_cache)
+parallel = ParallelVerses(chapter_cache, prefetcher)
+search_engine = SearchEngine()
+index_worker: SearchIndexWorker | None = None
+opener: ModuleOpener | None = None
+"""Builds the first module's sidecar at startup"""
+history = VerseHistory()
+"""Recently projected verses, recalled from the playlist tab"""
+verse_counts: dict[int, list[int]] = {}
+"""Verse count of every chapter per book of the opened module"""
+current_corpus: ResidentCorpus | None = None
+"""Text of the opened module held in memory, None unless PROJECTOR_RESIDENT is set"""
+reading: Reading | None = None
+"""Verse range being projected slide by slide, None when single verses are projected"""
+following_reading = False
+"""The verse list is being moved along with the reading"""
+startup_module = ""
+"""Module opened first instead of the first installed one, set when a session is restored"""
+resume_quietly = False
+"""The first module opened selects the restored verse without projecting it, the screen already shows it"""
+on_first_module: list[Callable[[], None]] = []
+"""Called once the first module is open (or none is installed), eg. to resume a restored playlist"""
+first_module_ready = False
+"""on_first_module was called"""
 
 
 class CloseEventFilter(QObject):
@@ -37,9 +86,14 @@ class BibleInfo:
         return f"({self.short_name}) {self.long_name}"
     
 books: list[BibleInfo]
+reference_index: ReferenceIndex
+book_model: BookListModel
+book_filter: BookFilterModel
+chapter_model: ChapterListModel
+verse_model: VerseListModel
 
 def init(window: QWidget,second_window: ShowScreen):
-    global cursor, current_book, current_chapter, current_verse, books
+    global current_book, current_chapter, current_verse, books, reference_index, book_model, book_filter, chapter_model, verse_model
 
     class ListKeyFilter(QObject):
         def eventFilter(self, obj, event):
@@ -55,26 +109,35 @@ def init(window: QWidget,second_window: ShowScreen):
     close_filter = CloseEventFilter(window)
     window.installEventFilter(close_filter)
 
-    init_books(window)
-
-    # Database
-    book_list = find_books()
-    if len(book_list) > 0:
-        cursor = init_db(book_list[0],cursor)
+    # The first module is opened once its sidecar is ready, the window shows meanwhile
+    books = []
+    reference_index = ReferenceIndex(books)
 
-    books = get_bible_info(cursor)
+    # QListViews
+    book_list_view: QListView  = window.findChild(QListView, "bookList") # type: ignore
+    chapter_list_view: QListView  = window.findChild(QListView, "chapterList") # type: ignore
+    verse_list_view: QListView  = window.findChild(QListView, "verseList") # type: ignore
 
+    book_model = BookListModel(window)
+    book_filter = BookFilterModel(book_model, window)
+    chapter_model = ChapterListModel(window)
+    verse_model = VerseListModel(window)
+    book_list_view.setModel(book_filter)
+    chapter_list_view.setModel(chapter_model)
+    verse_list_view.setModel(verse_model)
 
-    # QListWidgets
-    book_list_widget: QListWidget  = window.findChild(QListWidget, "bookList") # type: ignore
-    chapter_list_widget: QListWidget  = window.findChild(QListWidget, "chapterList") # type: ignore
-    verse_list_widget: QListWidget  = window.findChild(QListWidget, "verseList") # type: ignore
+    init_books(window)
 
     # QLineEdits
     book_edit: QLineEdit = window.findChild(QLineEdit, "bookEdit") # type: ignore
     chapter_edit: QLineEdit = window.findChild(QLineEdit, "chapterEdit") # type: ignore
     verse_edit: QLineEdit = window.findChild(QLineEdit, "verseEdit") # type: ignore
 
+    reference_edit: QLineEdit = window.findChild(QLineEdit, "referenceEdit") # type: ignore
+    search_edit: QLineEdit = window.findChild(QLineEdit, "searchEdit") # type: ignore
+    search_list_widget: QListWidget = window.findChild(QListWidget, "searchList") # type: ignore
+    bible_list_widget: QListWidget = window.findChild(QListWidget, "bibleList") # type: ignore
+
     text_info: QLabel = window.findChild(QLabel, "displayInfo") # type: ignore
 
     # QPushButtons
@@ -88,7 +151,7 @@ def init(window: QWidget,second_window: ShowScreen):
     action_black: QAction = window.findChild(QAction, "actionBlack") # type: ignore
 
     action_hide.triggered.connect(lambda: hide())
-    action_blank.triggered.connect(lambda: second_window.main_label.clear())
+    action_blank.triggered.connect(lambda: second_window.blank())
     action_black.triggered.connect(lambda: second_window.triggerBlack())
 
     def hide():
@@ -99,89 +162,157 @@ def init(window: QWidget,second_window: ShowScreen):
         
 
     # Custom keyevents for verse list
-    filter = ListKeyFilter(verse_list_widget)
-    verse_list_widget.installEventFilter(filter)
+    filter = ListKeyFilter(verse_list_view)
+    verse_list_view.installEventFilter(filter)
 
     # Button functions
     def increase_font_size():
-        f = verse_list_widget.font()
+        f = verse_list_view.font()
         f.setPointSize(f.pointSize() + 1)
-        verse_list_widget.setFont(f)
+        verse_list_view.setFont(f)
 
     def decrease_font_size():
-        f = verse_list_widget.font()
+        f = verse_list_view.font()
         f.setPointSize(max(1, f.pointSize() - 1))
-        verse_list_widget.setFont(f)
+        verse_list_view.setFont(f)
     
     def next_verse():
-        index = verse_list_widget.currentRow()
+        if reading is not None:
+            if reading.peek() is not None:
+                show_slide(reading.next())
+                return
+            # Past the last slide the list steps on from the end of the range
+            end_reading(reading.slides[-1].last)
+        index = verse_list_view.currentIndex().row()
         index += 1
-        if index == verse_list_widget.count():
-            if chapter_list_widget.currentIndex().row() < chapter_list_widget.count()-1:
-                chapter_list_widget.setCurrentRow(chapter_list_widget.currentRow()+1)
-                verse_list_widget.setCurrentRow(0)
+        if index == verse_model.rowCount():
+            if chapter_list_view.currentIndex().row() < chapter_model.rowCount()-1:
+                set_current_row(chapter_list_view, chapter_list_view.currentIndex().row()+1)
+                set_current_row(verse_list_view, 0)
         else:
-            verse_list_widget.setCurrentRow(index)
+            set_current_row(verse_list_view, index)
     
     def prev_verse():
         global current_chapter
-        index = verse_list_widget.currentRow()
+        if reading is not None:
+            if reading.position > 0:
+                show_slide(reading.prev())
+                return
+            end_reading(reading.slides[0].first)
+        index = verse_list_view.currentIndex().row()
         index -= 1
         if index < 0:
             if current_chapter > 1:
-                chapter_list_widget.setCurrentRow(chapter_list_widget.currentRow()-1)
-                verse_list_widget.setCurrentRow(verse_list_widget.count()-1)
+                set_current_row(chapter_list_view, chapter_list_view.currentIndex().row()-1)
+                set_current_row(verse_list_view, verse_model.rowCount()-1)
         else:
-            verse_list_widget.setCurrentRow(index)
+            set_current_row(verse_list_view, index)
 
     text_up.clicked.connect(increase_font_size)
     text_down.clicked.connect(decrease_font_size)
     btn_next.clicked.connect(next_verse)
 
-    book_list_widget.addItems([book.get_full_name() for book in books])
+    book_model.set_books(books)
 
-    # ListWidget row changed
-    book_list_widget.currentRowChanged.connect(lambda index: selected_book_changed(index))
-    chapter_list_widget.currentRowChanged.connect(lambda index: selected_chapter_changed(index))
-    verse_list_widget.currentRowChanged.connect(lambda index: selected_verse_changed(index))
-    verse_list_widget.clicked.connect(lambda index: selected_verse_clicked())
+    # ListView row changed
+    book_list_view.selectionModel().currentRowChanged.connect(lambda index, _: selected_book_changed(index.row()))
+    chapter_list_view.selectionModel().currentRowChanged.connect(lambda index, _: selected_chapter_changed(index.row()))
+    verse_list_view.selectionModel().currentRowChanged.connect(lambda index, _: selected_verse_changed(index.row()))
+    verse_list_view.clicked.connect(lambda index: selected_verse_clicked())
 
     def selected_book_changed(index: int):
         global current_book
         if index < 0:
             return
-        current = book_list_widget.item(index).text()
-        current_book = [book.id for book in books if book.get_full_name() == current][0]
-        numbers = get_chapter_number(current_book, cursor)
-        chapter_list_widget.clear()
-        chapter_list_widget.addItems([str(i) for i in range(1, numbers + 1)])
+        current_book = book_filter.index(index, 0).data(ID_ROLE)
+        numbers = get_chapter_number(current_book, get_cursor())
+        chapter_model.set_count(numbers)
         chapter_edit.setValidator(QIntValidator(1, numbers, chapter_edit))
 
     def selected_chapter_changed(index: int):
-        global current_chapter
+        global current_chapter, reading
         if index < 0: return
+        if not following_reading:
+            reading = None
         index += 1
         current_chapter = index
-        verses = get_verses(current_book, index, cursor)
-        verse_list_widget.clear()
-        verse_list_widget.addItems([f"{str(verse[0]) + '.':<5} {verse[1]}" for verse in verses])
-        verse_edit.setValidator(QIntValidator(1, len(verses)))
+        verse_model.set_verses(get_verses(current_book, index, get_cursor()))
+        verse_edit.setValidator(QIntValidator(1, get_verse_count(current_book, index)))
 
         book = [book.short_name for book in books if book.id == current_book][0]
         text_info.setText(book + " " + str(current_chapter))
+        # A resident module needs no warming, only the other modules are prefetched then
+        prefetcher.around(current_bible, current_book, current_chapter, get_chapter_number(current_book, get_cursor()),
+                          catalog.names(), current_corpus is None)
 
     def selected_verse_changed(index: int):
-        global current_verse
+        global current_verse, reading
         if index < 0:
             return
         current_verse = index
-        footer = text_info.text() + ":" + str(current_verse+1)
-        second_window.setText(verse_list_widget.currentItem().text(), footer)
+        if following_reading:
+            return
+        reading = None
+        project_verse()
 
     def selected_verse_clicked():
+        global reading
+        reading = None
+        project_verse()
+
+    def start_reading(reference: Reference):
+        """Project a verse range slide by slide, as many verses on a slide as fit at the reading size"""
+        global reading
+        rows = get_verses(current_book, current_chapter, get_cursor())
+        new_reading = make_reading(rows, reference.verse or 1, reference.verse_end or reference.verse or 1, text_info.text(),
+                                   second_window.width(), second_window.height(), second_window.font_family)
+        if len(new_reading) == 0:
+            return
+        reading = new_reading
+        show_slide(reading.next())
+
+    def show_slide(slide: Slide | None):
+        global following_reading
+        if slide is None or reading is None:
+            return
+        # The list follows the reading without projecting single verses
+        following_reading = True
+        set_current_row(verse_list_view, slide.first - 1)
+        following_reading = False
+        second_window.setText(slide.text, slide.footer)
+        history.add(HistoryEntry(current_bible, current_book, current_chapter, slide.first, slide.text, slide.footer))
+        following = reading.peek()
+        if following is not None:
+            second_window.prerender([following.text], following.footer)
+
+    def end_reading(verse: int):
+        global reading, following_reading
+        reading = None
+        following_reading = True
+        set_current_row(verse_list_view, verse - 1)
+        following_reading = False
+
+    def project_verse():
         footer = text_info.text() + ":" + str(current_verse+1)
-        text  = verse_list_widget.currentItem().text()
+        text = verse_list_view.currentIndex().data()
         second_window.setText(text, footer)
+        history.add(HistoryEntry(current_bible, current_book, current_chapter, current_verse+1, text, footer))
+        others = get_parallel_bibles(bible_list_widget)
+        if len(others) > 0:
+            parallel.request((current_book, current_chapter, current_verse+1), [current_bible] + others)
+        elif current_verse + 1 < verse_model.rowCount():
+            # The next verse is usually projected next, its frame is ready by then
+            second_window.prerender([verse_model.index(current_verse + 1).data()], text_info.text() + ":" + str(current_verse+2))
+
+    # Parallel translations
+    parallel.ready.connect(lambda request_id, rows: show_parallel(request_id, rows))
+    bible_list_widget.itemChanged.connect(lambda item: project_verse() if verse_list_view.currentIndex().isValid() else None)
+
+    def show_parallel(request_id: int, rows: list[tuple[str, int, str]]):
+        if request_id != parallel.request_id:
+            return
+        footer = text_info.text() + ":" + str(current_verse+1) + "  " + " | ".join(name for name, _, _ in rows)
+        second_window.setColumns([f"{verse}. {text}" if text else "" for _, verse, text in rows], footer)
 
     # LineEdit text changed
     book_edit.textChanged.connect(lambda text: filter_books(text))
@@ -189,30 +320,104 @@ def init(window: QWidget,second_window: ShowScreen):
     verse_edit.textChanged.connect(lambda text: verse_changed(text))
 
     def filter_books(text: str):
-        filtered_books = [book.get_full_name() for book in books if (text.lower() in book.get_full_name().lower())]
+        book_filter.set_text(text)
 
-        book_list_widget.clear()
-        book_list_widget.addItems(filtered_books)
-
-        if len(filtered_books) == 1:
-            book_list_widget.setCurrentRow(0)
+        if book_filter.rowCount() == 1:
+            set_current_row(book_list_view, 0)
             QApplication.focusWidget().focusNextChild() # type: ignore
     
     def chapter_changed(text: str):
-        filtered = [item for item in chapter_list_widget.findItems(text, Qt.MatchFlag.MatchStartsWith)]
+        filtered = chapter_model.match(chapter_model.index(0, 0), Qt.ItemDataRole.DisplayRole, text, -1, Qt.MatchFlag.MatchStartsWith)
         if len(filtered) == 1:
-            chapter_list_widget.setCurrentItem(filtered[0])
+            chapter_list_view.setCurrentIndex(filtered[0])
             QApplication.focusWidget().focusNextChild() # type: ignore
         else:
-            chapter_list_widget.setCurrentRow(-1)
+            set_current_row(chapter_list_view, -1)
     
     def verse_changed(text: str):
-        filtered = [item for item in verse_list_widget.findItems(text, Qt.MatchFlag.MatchStartsWith)]
+        filtered = verse_model.match(verse_model.index(0, 0), Qt.ItemDataRole.DisplayRole, text, -1, Qt.MatchFlag.MatchStartsWith)
         if len(filtered) == 1:
-            verse_list_widget.setCurrentItem(filtered[0])
+            verse_list_view.setCurrentIndex(filtered[0])
             QApplication.focusWidget().focusNextChild() # type: ignore
         else:
-            verse_list_widget.setCurrentRow(-1)
+            set_current_row(verse_list_view, -1)
+
+    # Verse search
+    search_results: list[SearchResult] = []
+    search_timer = QTimer(window)
+    search_timer.setSingleShot(True)
+    search_timer.setInterval(SEARCH_DELAY_MS)
+    search_timer.timeout.connect(lambda: search_verses(search_edit.text()))
+    search_edit.textChanged.connect(lambda: search_timer.start())
+    search_engine.ready.connect(lambda request_id, results: show_search_results(request_id, results))
+    search_list_widget.currentRowChanged.connect(lambda index: search_result_selected(index))
+
+    def search_verses(text: str):
+        # The opened module's matches come first
+        names = [current_bible] + [name for name in catalog.names() if name != current_bible] if current_bible else catalog.names()
+        search_engine.request(text, names)
+
+    def show_search_results(request_id: int, results: list[SearchResult]):
+        if request_id != search_engine.request_id:
+            return
+        search_results[:] = results
+        search_list_widget.clear()
+        search_list_widget.addItems([result.get_full_name() for result in search_results])
+
+    def search_result_selected(index: int):
+        global current_book, current_chapter, current_verse
+        if index < 0:
+            return
+        result = search_results[index]
+        current_book, current_chapter, current_verse = result.book_number, result.chapter, result.verse-1
+        if result.bible != current_bible:
+            bible_list_widget.setCurrentRow(catalog.index_of(result.bible))
+            return
+        show_reference(Reference(result.book_number, result.chapter, result.verse))
+
+    # An index build left running would be killed mid-transaction
+    QApplication.instance().aboutToQuit.connect(stop_indexing) # type: ignore
+    QApplication.instance().aboutToQuit.connect(history.flush) # type: ignore
+    # Scanning the modules opens each of them, it waits until the window is shown
+    QTimer.singleShot(0, lambda: open_first_module(window, bible_list_widget))
+
+    # Reference bar
+    reference_edit.textChanged.connect(lambda text: reference_changed(text))
+    reference_edit.returnPressed.connect(lambda: reference_finished())
+
+    def reference_changed(text: str):
+        reference = reference_index.parse(text)
+        if reference is None:
+            reference_edit.setStyleSheet("color: red;" if text.strip() else "")
+            reference_edit.setToolTip("")
+            return
+        reference_edit.setStyleSheet("")
+        name = [book.long_name for book in books if book.id == reference.book][0]
+        verses = f"{reference.verse}-{reference.verse_end}" if reference.verse_end else str(reference.verse or "")
+        reference_edit.setToolTip(f"{name} {reference.chapter or ''}{':' if verses else ''}{verses}")
+
+    def reference_finished():
+        reference = reference_index.parse(reference_edit.text())
+        if reference is not None:
+            show_reference(reference)
+
+    def show_reference(reference: Reference):
+        """Select the reference in the lists, projecting it only when a verse is given"""
+        book_edit.clear()
+        if not select_book(book_list_view, reference.book):
+            return
+        if reference.chapter is None:
+            chapter_list_view.setFocus()
+            return
+        set_current_row(chapter_list_view, min(reference.chapter, chapter_model.rowCount())-1)
+        if reference.verse is None:
+            verse_list_view.setFocus()
+            return
+        if reference.verse_end is not None and reference.verse_end > reference.verse:
+            start_reading(reference)
+        else:
+            set_current_row(verse_list_view, min(reference.verse, verse_model.rowCount())-1)
+        verse_list_view.setFocus()
 
     # LineEdit finished (Enter)
     chapter_edit.editingFinished.connect(lambda: chapter_finished())
@@ -220,69 +425,176 @@ def init(window: QWidget,second_window: ShowScreen):
 
     def chapter_finished():
         text = chapter_edit.text()
-        chapter_list_widget.setCurrentRow(int(text)-1)
+        set_current_row(chapter_list_view, int(text)-1)
         
         QApplication.focusWidget().focusNextChild() # type: ignore
     
     def verse_finished():
         text = verse_edit.text()
-        verse_list_widget.setCurrentRow(int(text)-1)
+        set_current_row(verse_list_view, int(text)-1)
         QApplication.focusWidget().focusNextChild() # type: ignore
 
 # Helper functions
+@traced("bible.get_bible_info")
 def get_bible_info(cursor: sqlite3.Cursor | None) -> list[BibleInfo]:
     if cursor == None:
         return []
-    cursor.execute("SELECT book_number, short_name, long_name FROM books ORDER BY book_number")
+    cursor.execute(books_query)
     rows: list[tuple[int, str, str]] = cursor.fetchall()
     return [BibleInfo(int(r[0]), r[1], r[2]) for r in rows]
 
 
+@traced("bible.get_chapter_number")
 def get_chapter_number(book_index: int, cursor: sqlite3.Cursor | None) -> int:
     if cursor == None:
         return -1
-    cursor.execute("SELECT chapter from verses WHERE book_number == ? GROUP by chapter", (book_index,))
-    res = cursor.fetchall()
-    return len(res)
+    return len(verse_counts.get(book_index, []))
+
+def get_verse_count(book_index: int, chapter_index: int) -> int:
+    chapters = verse_counts.get(book_index, [])
+    if 0 < chapter_index <= len(chapters):
+        return chapters[chapter_index-1]
+    return 0
 
-def get_verses(book_index: int, chapter_index: int, cursor: sqlite3.Cursor | None) -> list[tuple[int, str]]:
+@traced("bible.get_verses")
+def get_verses(book_index: int, chapter_index: int, cursor: sqlite3.Cursor | None) -> Sequence[tuple[int, str]]:
     if cursor == None:
         return []
-    cursor.execute("SELECT verse, text FROM verses WHERE book_number == ? AND chapter == ?", (book_index, chapter_index))
-    res = cursor.fetchall()
-    for i in range(len(res)):
-        res[i] = (res[i][0], re.sub(r"\s{2,}", " ", re.sub(r"<[^>]*>|\[[^\]]*\]", "",  res[i][1])).strip()) # bro what the helly is this? if you can deocode this : tip fedora
+    if current_corpus is not None:
+        return current_corpus.chapter(book_index, chapter_index)
+    key = (current_bible, book_index, chapter_index)
+    res = chapter_cache.get(key)
+    if res is not None:
+        return res
+    res = load_chapter(current_bible, cursor, book_index, chapter_index, using_sidecar)
+    chapter_cache.put(key, res)
     return res
     
-def init_db(name: str, cursor: sqlite3.Cursor | None) -> sqlite3.Cursor:
-    if cursor != None:
-        cursor.close()
-        cursor.connection.close()
-    db_path: Path = Path(__file__).parent / f"books/{name}.SQLite3"
-    conn: sqlite3.Connection = sqlite3.connect(database=f"file:{db_path}?mode=ro", uri=True)
-    return conn.cursor()
+def read_chapter(name: str, book_index: int, chapter_index: int) -> Sequence[tuple[int, str]]:
+    """Cleaned chapter of any installed module, through the chapter cache unless the module is resident"""
+    key = (name, book_index, chapter_index)
+    res = chapter_cache.get(key)
+    if res is None:
+        handle = modules.get(name)
+        if handle.corpus is not None:
+            return handle.corpus.chapter(book_index, chapter_index)
+        res = load_chapter(name, handle.cursor, book_index, chapter_index, handle.sidecar)
+        chapter_cache.put(key, res)
+    return res
 
+def get_cursor() -> sqlite3.Cursor | None:
+    """Cursor of the opened module"""
+    if not current_bible:
+        return None
+    return init_db(current_bible)
+
+@traced("bible.init_db")
+def init_db(name: str) -> sqlite3.Cursor:
+    global current_bible, using_sidecar, verse_counts, current_corpus, books_query
+    handle = modules.get(name)
+    current_bible = name
+    using_sidecar = handle.sidecar
+    books_query = handle.books_query
+    verse_counts = handle.verse_counts
+    current_corpus = handle.corpus
+    return handle.cursor
+
+def set_current_row(view: QListView, row: int):
+    """Make row current, a row out of range clears the current index"""
+    view.setCurrentIndex(view.model().index(row, 0))
+
+def select_book(book_list_view: QListView, book_id: int) -> bool:
+    """Make the book current in the (possibly filtered) book list"""
+    index = book_filter.mapFromSource(book_model.index(book_model.row_of(book_id), 0))
+    if not index.isValid():
+        return False
+    book_list_view.setCurrentIndex(index)
+    return True
+
+def get_parallel_bibles(bible_list_widget: QListWidget) -> list[str]:
+    """Checked modules shown next to the opened one"""
+    items = [bible_list_widget.item(i) for i in range(bible_list_widget.count())]
+    return [item.text() for item in items if item.checkState() == Qt.CheckState.Checked and item.text() != current_bible]
+
+def start_indexing():
+    """(Re)build missing or stale search indexes in the background"""
+    global index_worker
+    stop_indexing()
+    names = [name for name in catalog.names() if not is_indexed(name)]
+    for name in names:
+        search_engine.forget(name)
+    index_worker = SearchIndexWorker(names)
+    index_worker.start()
+
+def stop_indexing():
+    """Let a running index build finish its current book and stop, also called when the application quits"""
+    if index_worker is not None and index_worker.isRunning():
+        index_worker.requestInterruption()
+        index_worker.wait()
+
+def open_first_module(window: QWidget, bible_list_widget: QListWidget):
+    """List the installed modules, prepare the first one on a worker thread, then select it and start indexing"""
+    global opener
+    catalog.scan()
+    catalog.watch()
+    layout_books(window)
+    book_list = catalog.names()
+    if len(book_list) == 0:
+        start_indexing()
+        first_module_opened()
+        return
+
+    name = startup_module if startup_module in book_list else book_list[0]
+
+    def on_opened():
+        # Loaders that started before the sidecar was ready read the module itself
+        close_cursors(name)
+        bible_list_widget.setCurrentRow(catalog.index_of(name))
+        start_indexing()
+        first_module_opened()
+
+    opener = ModuleOpener(name)
+    opener.opened.connect(on_opened)
+    # Quitting during the first sidecar build waits for it instead of killing the thread
+    QApplication.instance().aboutToQuit.connect(opener.wait) # type: ignore
+    opener.start()
+
+def first_module_opened():
+    global first_module_ready
+    first_module_ready = True
+    for callback in on_first_module:
+        callback()
+
+def after_first_module(callback: Callable[[], None]):
+    """Call back once the first module is open, right away when it already is | the UI wired after the first frame may come late"""
+    if first_module_ready:
+        callback()
+    else:
+        on_first_module.append(callback)
+
+@traced("bible.change_bible")
 def change_bible(index: int):
-        global cursor, current_book, current_chapter, current_verse, books
+        global current_book, current_chapter, current_verse, books, reference_index, following_reading, resume_quietly
         top_level = QApplication.topLevelWidgets()
         window = [top for top in top_level if top.objectName() == "MainWindow"][0]
-        name = find_books()[index]
+        name = catalog.name_at(index)
+        if name is None:
+            return
 
-        book_list_widget: QListWidget  = window.findChild(QListWidget, "bookList") # type: ignore
-        chapter_list_widget: QListWidget  = window.findChild(QListWidget, "chapterList") # type: ignore
-        verse_list_widget: QListWidget  = window.findChild(QListWidget, "verseList") # type: ignore
+        book_list_view: QListView  = window.findChild(QListView, "bookList") # type: ignore
+        chapter_list_view: QListView  = window.findChild(QListView, "chapterList") # type: ignore
+        verse_list_view: QListView  = window.findChild(QListView, "verseList") # type: ignore
         try:
-            cursor = init_db(name, cursor)
-            books = get_bible_info(cursor)
-            
-            book_list_widget.clear()
-            book_list_widget.addItems([book.get_full_name() for book in books])
-            c_book = [b for b in books if b.id == current_book]
-            if len(c_book) > 0:
-                book_row = books.index(c_book[0])
-                book_list_widget.setCurrentRow(book_row)
-
-            chapter_list_widget.setCurrentRow(current_chapter-1)
-            verse_list_widget.setCurrentRow(current_verse)
+            books = get_bible_info(init_db(name))
+            reference_index = ReferenceIndex(books)
+
+            book_model.set_books(books)
+            select_book(book_list_view, current_book)
+
+            following_reading = resume_quietly
+            set_current_row(chapter_list_view, current_chapter-1)
+            set_current_row(verse_list_view, current_verse)
         except Exception as e:
-            print(f"Error changing database to {name}: {e}")
\ No newline at end of file
+            print(f"Error changing database to {name}: {e}")
+        finally:
+            following_reading = resume_quietly = False
\ No newline at end of file
@@ -1,10 +1,12 @@
-from PySide6.QtUiTools import QUiLoader
+from typing import TYPE_CHECKING
 from PySide6.QtWidgets import QWidget, QPushButton, QCheckBox, QMessageBox, QListWidget, QProgressBar, QLabel
 from PySide6.QtCore import QFile, Qt,  QThread, Signal
-from urllib.request import urlretrieve
-import zipfile
-import os
-from utils.file_manager import find_books
+from PySide6.QtGui import QColor
+from utils.file_manager import BOOKS_DIR
+from database.sidecar import build_sidecar
+
+if TYPE_CHECKING:
+    from utils.downloader import DownloadJob
 
 class BibleBook:
     def __init__(self, name:str, id:str, url: str):
@@ -23,21 +25,26 @@ books = [
 ]
 
 def init_books(main_window: QWidget):
-    from database.bible import change_bible
-    book_window = load_ui()
-    layout_books(main_window)
-
-    # Book window
-    check_boxes = book_window.findChildren(QCheckBox)
-    bnt_download_books: QPushButton = book_window.findChild(QPushButton, "btnDownloadBooks") # type: ignore
-    bnt_download_books.clicked.connect(lambda: btn_download())
+    from database.bible import catalog, change_bible
+    book_window: QWidget | None = None
+    check_boxes: list[QCheckBox] = []
 
     # Book changing
     btn_books: QPushButton = main_window.findChild(QPushButton, "btnBooks") # type: ignore
-    btn_refresh: QPushButton = book_window.findChild(QPushButton, "btnRefresh") # type: ignore
-    
-    btn_books.clicked.connect(lambda: book_window.show())
-    btn_refresh.clicked.connect(lambda: layout_books(main_window))
+    btn_books.clicked.connect(lambda: get_book_window().show())
+
+    def get_book_window() -> QWidget:
+        """The download window is rarely opened, so it is only loaded on first use"""
+        nonlocal book_window, check_boxes
+        if book_window is None:
+            book_window = load_ui()
+            check_boxes = book_window.findChildren(QCheckBox)
+            bnt_download_books: QPushButton = book_window.findChild(QPushButton, "btnDownloadBooks") # type: ignore
+            btn_refresh: QPushButton = book_window.findChild(QPushButton, "btnRefresh") # type: ignore
+            bnt_download_books.clicked.connect(lambda: btn_download())
+            btn_refresh.clicked.connect(lambda: catalog.scan())
+            set_check_boxes()
+        return book_window
 
     def btn_download():
         info_window = DownloadInfo(main_window)
@@ -55,6 +62,7 @@ def init_books(main_window: QWidget):
         worker = DownloadWorker(books_to_download)
 
         worker.progress.connect(info_window.set_progress)
+        worker.received.connect(info_window.set_received)
         worker.finished.connect(lambda: on_download_finished(info_window, worker))
         worker.failed.connect(lambda msg: on_download_failed(info_window, worker, msg))
 
@@ -62,36 +70,64 @@ def init_books(main_window: QWidget):
 
     def on_download_finished(info_window, worker):
         info_window.set_state(DownloadInfo.FINISHED)
-        set_check_boxes()
-        layout_books(main_window)
+        # Picks the new modules up without waiting for the directory watcher
+        catalog.scan()
         worker.deleteLater()
 
     def on_download_failed(info_window, worker, msg):
         info_window.set_state(DownloadInfo.FAILED)
         info_window.label.setText(f"Download failed: {msg}")
+        catalog.scan()
         worker.deleteLater()
+
+    def refresh_installed():
+        from database.bible import chapter_cache, modules, parallel, start_indexing
+        from database.prefetch import close_cursors
+        modules.close_all()
+        close_cursors()
+        chapter_cache.clear()
+        parallel.forget()
+        set_check_boxes()
+        layout_books(main_window)
+        start_indexing()
             
     def set_check_boxes():
-        found_books = find_books()
         for item in check_boxes:
-            if item.objectName().removeprefix("check") in found_books:
+            if item.objectName().removeprefix("check") in catalog:
                 item.setChecked(True)
                 item.setEnabled(False)
 
     bible_list: QListWidget = main_window.findChild(QListWidget, "bibleList") # type: ignore
     bible_list.currentRowChanged.connect(lambda x: change_bible(x))
-    bible_list.setCurrentRow(0)
-    set_check_boxes()
+    catalog.changed.connect(lambda: refresh_installed())
 
 def layout_books(main_window):
-    found_books = find_books()
+    from database.bible import catalog
+    found_books = catalog.names()
     bible_list: QListWidget = main_window.findChild(QListWidget, "bibleList") # type: ignore
     if not bible_list:
         return
-    c_book = bible_list.currentIndex()
+    # Keep the same module selected even if others were added or removed before it
+    current = bible_list.currentItem()
+    c_book = -1 if current is None else found_books.index(current.text()) if current.text() in found_books else 0
+    checked = [bible_list.item(i).text() for i in range(bible_list.count()) if bible_list.item(i).checkState() == Qt.CheckState.Checked]
+    bible_list.blockSignals(True)
     bible_list.clear()
     bible_list.addItems(found_books)
-    bible_list.setCurrentIndex(c_book)
+    # Checked modules are projected next to the selected one
+    for i in range(bible_list.count()):
+        item = bible_list.item(i)
+        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(Qt.CheckState.Checked if item.text() in checked else Qt.CheckState.Unchecked)
+        info = catalog.get(item.text())
+        if info is not None:
+            warnings = info.schema.warnings()
+            item.setToolTip("\n".join([str(info), *([info.description] if info.description else []), *warnings]))
+            # Flagged up front, a slow module should be noticed before the service and not during it
+            if warnings:
+                item.setForeground(QColor("darkorange"))
+    bible_list.blockSignals(False)
+    bible_list.setCurrentRow(c_book)
 
 def clear_layout(layout: QListWidget):
     while layout.count():
@@ -102,6 +138,7 @@ def clear_layout(layout: QListWidget):
             widget.deleteLater()
 
 def load_ui() -> QWidget:
+    from PySide6.QtUiTools import QUiLoader
     ui_file_name = "ui/downloadBooks.ui"
     ui_file = QFile(ui_file_name)
     loader = QUiLoader()
@@ -110,13 +147,15 @@ def load_ui() -> QWidget:
 
     return book_window
 
-def download_book(book: BibleBook):
-    path = f"./database/books/{book.id}.zip"
+def download_job(book: BibleBook) -> "DownloadJob":
+    from utils.downloader import DownloadJob
+    return DownloadJob(book.id, book.url, f"{book.id}.SQLite3", BOOKS_DIR, lambda: build_sidecar(book.id))
 
-    urlretrieve(book.url, path)
-    with zipfile.ZipFile(path, mode="r") as archive:
-        archive.extract(f"{book.id}.SQLite3", f"./database/books")
-    os.remove(path)
+def download_book(book: BibleBook):
+    from utils.downloader import DownloadEngine
+    errors = DownloadEngine(max_concurrent=1).run([download_job(book)])
+    if book.id in errors:
+        raise errors[book.id]
 
 def show_finished_alert():
     alert = QMessageBox()
@@ -200,6 +239,10 @@ class DownloadInfo(QMessageBox):
         self.progress.setValue(percent)
         self.label.setText(f"Downloading... {percent}%")
 
+    def set_received(self, received: int, total: int):
+        """Show downloaded megabytes next to the percentage."""
+        self.label.setText(f"Downloading... {self.progress.value()}% ({received / 1e6:.1f} / {total / 1e6:.1f} MB)")
+
     def _lock_window(self, locked: bool):
         """Prevent closing while downloading."""
         self.setWindowFlag(Qt.WindowType.WindowCloseButtonHint, not locked)
@@ -217,23 +260,33 @@ class DownloadInfo(QMessageBox):
 
 class DownloadWorker(QThread):
     progress = Signal(int)
+    received = Signal(int, int)
     finished = Signal()
     failed = Signal(str)
 
-    def __init__(self, books, parent=None):
+    def __init__(self, books, parent=None, max_concurrent: int = 3):
         super().__init__(parent)
         self.books = books
+        self.max_concurrent = max_concurrent
 
     def run(self):
-        total = len(self.books)
+        from utils.downloader import DownloadEngine
+        self.engine = DownloadEngine(self.max_concurrent)
         try:
-            for index, book in enumerate(self.books, start=1):
-                download_book(book)
-                percent = int(index / total * 100)
-                self.progress.emit(percent)
-            self.finished.emit()
+            errors = self.engine.run([download_job(book) for book in self.books], self.report)
         except Exception as e:
             self.failed.emit(str(e))
+            return
+        if errors:
+            # Finished books stay installed, partial files are resumed on the next try
+            self.failed.emit(", ".join(f"{name}: {error}" for name, error in errors.items()))
+        else:
+            self.finished.emit()
+
+    def report(self, received: int, total: int):
+        if total > 0:
+            self.progress.emit(min(100, int(received / total * 100)))
+            self.received.emit(received, total)
 
 if __name__ == "__main__":
  pass
\ No newline at end of file
@@ -0,0 +1,108 @@
+import sqlite3
+from pathlib import Path
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from database.inspector import ModuleSchema, inspect_module
+from utils.file_manager import BOOKS_DIR, find_books, book_path
+
+class ModuleInfo:
+    def __init__(self, name: str, language: str, description: str, book_count: int, size: int, mtime_ns: int, schema: ModuleSchema):
+        self.name = name
+        self.language = language
+        self.description = description
+        self.book_count = book_count
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.schema = schema
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.language or '?'}, {self.book_count} books, {self.size / 1e6:.1f} MB)"
+
+def read_module_info(name: str) -> ModuleInfo | None:
+    """Metadata of a MyBible module | None if the file is not a complete module, eg. mid-download"""
+    path = book_path(name)
+    try:
+        stat = path.stat()
+        schema = inspect_module(name)
+        if not schema.ok:
+            print(f"Skipping {name}: {'; '.join(schema.problems)}")
+            return None
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            info: dict[str, str] = {}
+            if "info" in schema.optional_tables:
+                info = dict(conn.execute("SELECT name, value FROM info").fetchall())
+            book_count = conn.execute(f"SELECT COUNT(*) FROM ({schema.plans['books']})").fetchone()[0]
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error):
+        return None
+    return ModuleInfo(name, info.get("language", ""), info.get("description", ""), book_count, stat.st_size, stat.st_mtime_ns, schema)
+
+class ModuleCatalog(QObject):
+    """Installed modules, validated once and kept up to date by watching the books directory
+
+    Empty until the first scan, which opens every new module and so waits until the window is shown"""
+    changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._modules: dict[str, ModuleInfo] = {}
+        self._names: list[str] = []
+        self._watcher: QFileSystemWatcher | None = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(300)
+        self._timer.timeout.connect(self.scan)
+        self.scanned = False
+
+    def watch(self):
+        """Rescan when the directory changes | needs a running QApplication"""
+        if self._watcher is None:
+            BOOKS_DIR.mkdir(parents=True, exist_ok=True)
+            self._watcher = QFileSystemWatcher([str(BOOKS_DIR)], self)
+            # A download touches the directory several times, one rescan after it settles is enough
+            self._watcher.directoryChanged.connect(lambda _: self._timer.start())
+
+    def scan(self) -> bool:
+        """Re-read the directory, validating only new or modified files | returns whether anything changed
+
+        changed is emitted from the second scan on, nothing was listed before the first one"""
+        modules: dict[str, ModuleInfo] = {}
+        for name in (find_books() if BOOKS_DIR.exists() else []):
+            known = self._modules.get(name)
+            try:
+                stat = book_path(name).stat()
+            except OSError:
+                continue
+            if known is not None and known.size == stat.st_size and known.mtime_ns == stat.st_mtime_ns:
+                modules[name] = known
+                continue
+            info = read_module_info(name)
+            if info is not None:
+                modules[name] = info
+        changed = modules.keys() != self._modules.keys() or any(modules[name] is not self._modules[name] for name in modules)
+        self._modules = modules
+        self._names = sorted(modules)
+        if changed and self.scanned:
+            self.changed.emit()
+        self.scanned = True
+        return changed
+
+    def names(self) -> list[str]:
+        """Module names in display order"""
+        return list(self._names)
+
+    def name_at(self, index: int) -> str | None:
+        return self._names[index] if 0 <= index < len(self._names) else None
+
+    def index_of(self, name: str) -> int:
+        return self._names.index(name) if name in self._modules else -1
+
+    def get(self, name: str) -> ModuleInfo | None:
+        return self._modules.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._modules
+
+    def __len__(self) -> int:
+        return len(self._names)
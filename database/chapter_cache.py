@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from database.inspector import module_plans
+from database.sidecar import read_chapter
+from utils.text import clean_verse_text
+from utils.trace import span
+
+ChapterKey = tuple[str, int, int]
+"""(bible, book_number, chapter)"""
+
+class ChapterCache:
+    """Bounded LRU cache of cleaned chapters, shared with the prefetch threads"""
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._chapters: OrderedDict[ChapterKey, list[tuple[int, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ChapterKey) -> list[tuple[int, str]] | None:
+        with self._lock:
+            verses = self._chapters.get(key)
+            if verses is not None:
+                self._chapters.move_to_end(key)
+            return verses
+
+    def put(self, key: ChapterKey, verses: list[tuple[int, str]]):
+        with self._lock:
+            self._chapters[key] = verses
+            self._chapters.move_to_end(key)
+            while len(self._chapters) > self.max_size:
+                self._chapters.popitem(last=False)
+
+    def invalidate(self, bible: str):
+        """Drop every cached chapter of the given module"""
+        with self._lock:
+            for key in [key for key in self._chapters if key[0] == bible]:
+                del self._chapters[key]
+
+    def clear(self):
+        with self._lock:
+            self._chapters.clear()
+
+    def __contains__(self, key: ChapterKey) -> bool:
+        with self._lock:
+            return key in self._chapters
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._chapters)
+
+def load_chapter(name: str, cursor: sqlite3.Cursor, book_index: int, chapter_index: int, sidecar: bool) -> list[tuple[int, str]]:
+    """Read a cleaned chapter from a sidecar or directly from a MyBible module"""
+    if sidecar:
+        with span("chapter.read_sidecar"):
+            return read_chapter(cursor, book_index, chapter_index)
+    with span("chapter.query"):
+        cursor.execute(module_plans(name)["chapter"], (book_index, chapter_index))
+        rows = cursor.fetchall()
+    with span("chapter.clean"):
+        return [(verse, clean_verse_text(text)) for verse, text in rows]
@@ -0,0 +1,101 @@
+import sqlite3
+from array import array
+from collections.abc import Sequence
+from typing import overload
+from database.inspector import module_plans
+from utils.text import clean_verse_text
+
+class ChapterView(Sequence):
+    """Verses of a chapter as (verse, text) rows, decoded from the corpus buffer only when a row is read"""
+    def __init__(self, corpus: "ResidentCorpus", first: int, count: int):
+        self.corpus = corpus
+        self.first = first
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[int, str]: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[int, str]]: ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.corpus.verse(self.first + index)
+
+class ResidentCorpus:
+    """A whole module kept in memory: every cleaned verse in one UTF-8 buffer with array offset tables
+
+    Row i is verse_numbers[i] with the text buffer[offsets[i]:offsets[i+1]], rows are ordered by book and chapter.
+    chapters[book][c-1] is the first row of chapter c, the last item is the end of the book."""
+    def __init__(self, name: str, buffer: bytes, offsets: array, verse_numbers: array, chapters: dict[int, array]):
+        self.name = name
+        self.buffer = memoryview(buffer)
+        self.offsets = offsets
+        self.verse_numbers = verse_numbers
+        self.chapters = chapters
+
+    def verse(self, row: int) -> tuple[int, str]:
+        return (self.verse_numbers[row], str(self.buffer[self.offsets[row]:self.offsets[row+1]], "utf-8"))
+
+    def chapter(self, book: int, chapter: int) -> ChapterView:
+        """Zero-copy view of a chapter, empty when it does not exist"""
+        starts = self.chapters.get(book)
+        if starts is None or not 0 < chapter < len(starts):
+            return ChapterView(self, 0, 0)
+        return ChapterView(self, starts[chapter-1], starts[chapter] - starts[chapter-1])
+
+    def memory_bytes(self) -> int:
+        """Size of the buffer and the offset tables"""
+        tables = [self.offsets, self.verse_numbers, *self.chapters.values()]
+        return self.buffer.nbytes + sum(table.itemsize * len(table) for table in tables)
+
+    def __len__(self) -> int:
+        return len(self.verse_numbers)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {len(self)} verses in memory, {self.memory_bytes() / 1e6:.1f} MB"
+
+def load_corpus(name: str, cursor: sqlite3.Cursor, sidecar: bool) -> ResidentCorpus:
+    """Read every verse of a module once, the sidecar already holds cleaned text in order
+
+    Raises ValueError when a verse number does not fit the table, eg. in a damaged module."""
+    if sidecar:
+        cursor.execute("""
+            SELECT c.book_number, c.chapter, v.verse, v.text FROM chapters c
+            JOIN verses v ON v.id >= c.first_id AND v.id < c.first_id + c.verse_count
+            ORDER BY v.id
+        """)
+    else:
+        cursor.execute(module_plans(name)["all_verses"])
+
+    parts: list[bytes] = []
+    offsets = array("I", [0])
+    verse_numbers = array("H")
+    chapters: dict[int, array] = {}
+    size = 0
+    last: tuple[int, int] | None = None
+    for row, (book, chapter, verse, text) in enumerate(cursor):
+        # Module columns are NUMERIC, numbers may come back as REAL (1.0)
+        book, chapter = int(book), int(chapter)
+        if (book, chapter) != last:
+            chapters.setdefault(book, array("I")).append(row)
+            last = (book, chapter)
+        data = (text if sidecar else clean_verse_text(text or "")).encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        offsets.append(size)
+        try:
+            verse_numbers.append(int(verse))
+        except OverflowError as e:
+            raise ValueError(f"Verse number {verse} of {book} {chapter} is out of range") from e
+    # Closing entry of every book, so a chapter's length is the difference of two starts
+    books = sorted(chapters)
+    for i, book in enumerate(books):
+        chapters[book].append(chapters[books[i+1]][0] if i + 1 < len(books) else len(verse_numbers))
+    return ResidentCorpus(name, b"".join(parts), offsets, verse_numbers, chapters)
@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+from pathlib import Path
+from utils.file_manager import CACHE_DIR, book_path
+
+INSPECT_VERSION = 1
+"""Bump when the checks or the generated queries change"""
+SQLITE_HEADER = b"SQLite format 3\x00"
+OPTIONAL_TABLES = ("info", "stories", "introductions", "books_all")
+VERSE_COLUMNS = {"book_number", "chapter", "verse", "text"}
+
+LIVE_QUERIES = ("chapter", "book_verses")
+"""Queries run per selection or per book, a full table scan in them is reported"""
+
+_schemas: dict[str, tuple[tuple[int, int], "ModuleSchema"]] = {}
+"""name -> ((size, mtime), schema), so per-chapter reads skip the json file"""
+
+class ModuleSchema:
+    """What a MyBible file contains and the queries that read it"""
+    def __init__(self, name: str, problems: list[str], optional_tables: list[str], plans: dict[str, str],
+                 indexed: bool, scans: dict[str, str]):
+        self.name = name
+        self.problems = problems
+        """Reasons the file cannot be used, empty for a usable module"""
+        self.optional_tables = optional_tables
+        self.plans = plans
+        """Query name -> SQL for this file's tables and columns"""
+        self.indexed = indexed
+        """verses has an index starting with (book_number, chapter)"""
+        self.scans = scans
+        """Live query name -> its EXPLAIN QUERY PLAN line, for queries that scan a whole table"""
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def warnings(self) -> list[str]:
+        """Slow spots of the file | chapters are normally read from the sidecar, these hit indexing and sidecar-less reads"""
+        warnings = [] if self.indexed else ["No index on verses(book_number, chapter)"]
+        warnings += [f"The {query} query scans the whole table ({detail})" for query, detail in self.scans.items()]
+        return warnings
+
+    def to_json(self) -> dict:
+        return {"problems": self.problems, "optional_tables": self.optional_tables, "plans": self.plans,
+                "indexed": self.indexed, "scans": self.scans}
+
+def schema_path(name: str) -> Path:
+    return CACHE_DIR / f"{name}.schema.json"
+
+def table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def has_chapter_index(conn: sqlite3.Connection) -> bool:
+    for row in conn.execute("PRAGMA index_list(verses)"):
+        columns = [info[2] for info in sorted(conn.execute(f"PRAGMA index_info({row[1]})"))]
+        if columns[:2] == ["book_number", "chapter"]:
+            return True
+    return False
+
+def make_plans(books_table: str, books_columns: set[str]) -> dict[str, str]:
+    long_name = "long_name" if "long_name" in books_columns else "short_name"
+    present = " WHERE is_present = 1" if "is_present" in books_columns else ""
+    return {
+        "books": f"SELECT book_number, short_name, {long_name} FROM {books_table}{present} ORDER BY book_number",
+        "chapter": "SELECT verse, text FROM verses WHERE book_number = ? AND chapter = ? ORDER BY verse",
+        "book_verses": "SELECT chapter, verse, text FROM verses WHERE book_number = ?",
+        "counts": "SELECT book_number, chapter, COUNT(*) FROM verses GROUP BY book_number, chapter ORDER BY book_number, chapter",
+        "all_verses": "SELECT book_number, chapter, verse, text FROM verses ORDER BY book_number, chapter, verse",
+    }
+
+def inspect_file(name: str, path: Path) -> ModuleSchema:
+    """Check the tables and columns, generate the queries and explain the live ones"""
+    with open(path, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            return ModuleSchema(name, ["Not an SQLite file"], [], {}, False, {})
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        problems: list[str] = []
+        missing = VERSE_COLUMNS - table_columns(conn, "verses")
+        if missing:
+            problems.append(f"verses lacks {', '.join(sorted(missing))}")
+        # books only lists the present books, books_all every book with an is_present flag
+        books_table = "books" if "books" in tables else "books_all"
+        books_columns = table_columns(conn, books_table)
+        if not {"book_number", "short_name"} <= books_columns:
+            problems.append("No books table with book_number and short_name")
+        if problems:
+            return ModuleSchema(name, problems, [], {}, False, {})
+
+        plans = make_plans(books_table, books_columns)
+        scans: dict[str, str] = {}
+        for query in LIVE_QUERIES:
+            parameters = (0,) * plans[query].count("?")
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {plans[query]}", parameters):
+                if row[-1].startswith("SCAN"):
+                    scans[query] = row[-1]
+        optional = [table for table in OPTIONAL_TABLES if table in tables]
+        return ModuleSchema(name, [], optional, plans, has_chapter_index(conn), scans)
+    finally:
+        conn.close()
+
+def inspect_module(name: str) -> ModuleSchema:
+    """Schema of an installed module, inspected once per file version and cached next to the sidecar"""
+    path = book_path(name)
+    stat = path.stat()
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    known = _schemas.get(name)
+    if known is not None and known[0] == stamp:
+        return known[1]
+    cache = schema_path(name)
+    try:
+        with open(cache, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["version"] == INSPECT_VERSION and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns:
+            schema = ModuleSchema(name, **cached["schema"])
+            _schemas[name] = (stamp, schema)
+            return schema
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        schema = inspect_file(name, path)
+    except sqlite3.Error as e:
+        schema = ModuleSchema(name, [f"Unreadable: {e}"], [], {}, False, {})
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache.with_name(cache.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INSPECT_VERSION, "size": stat.st_size, "mtime": stat.st_mtime_ns, "schema": schema.to_json()}, f)
+        os.replace(tmp_path, cache)
+    except OSError as e:
+        print(f"Could not cache the schema of {name}: {e}")
+    _schemas[name] = (stamp, schema)
+    return schema
+
+def module_plans(name: str) -> dict[str, str]:
+    """Queries for reading the module file itself | raises ValueError for an unusable file"""
+    schema = inspect_module(name)
+    if not schema.ok:
+        raise ValueError(f"{name}: {'; '.join(schema.problems)}")
+    return schema.plans
@@ -0,0 +1,152 @@
+import threading
+from PySide6.QtCore import QObject, QRunnable, Signal
+from database.chapter_cache import ChapterCache, load_chapter
+from database.prefetch import Prefetcher, thread_cursor
+from database.registry import count_verses
+
+Reference = tuple[int, int, int]
+"""(book_number, chapter, verse)"""
+
+# English (KJV) chapter layout -> Hebrew based layout used by eg. the Hungarian translations
+# (book_number, eng chapters, heb chapters, eng chapter, first verse, last verse, heb chapter, heb first verse)
+_CHAPTER_SHIFTS: list[tuple[int, int, int, int, int, int, int, int]] = [
+    (360, 3, 4, 2, 28, 32, 3, 1),   # Joel 2:28-32 = 3:1-5
+    (360, 3, 4, 3, 1, 21, 4, 1),    # Joel 3 = 4
+    (460, 4, 3, 4, 1, 6, 3, 19),    # Malachi 4:1-6 = 3:19-24
+]
+_PSALMS = 230
+# Psalms whose title is numbered as verse 1 (or 1-2) in Hebrew based layouts, the English layout leaves it unnumbered
+_PSALM_TITLES: dict[int, int] = {
+    **dict.fromkeys([3, 4, 5, 6, 7, 8, 9, 12, 13, 18, 19, 20, 21, 22, 30, 31, 34, 36, 38, 39, 40, 41, 42, 44, 45, 46, 47, 48,
+                     49, 53, 55, 56, 57, 58, 59, 61, 62, 63, 64, 65, 67, 68, 69, 70, 75, 76, 77, 80, 81, 83, 84, 85, 88, 89,
+                     92, 102, 108, 140, 142], 1),
+    **dict.fromkeys([51, 52, 54, 60], 2),
+}
+
+class Alignment:
+    """Precomputed mapping of references from one module's versification to another's"""
+    def __init__(self, source: dict[int, list[int]], target: dict[int, list[int]]):
+        self.books: dict[int, int] = {}
+        self.verses: dict[tuple[int, int, int], tuple[int, int]] = {}
+        self.offsets: dict[tuple[int, int], int] = {}
+
+        source_books, target_books = sorted(source), sorted(target)
+        for i, book in enumerate(source_books):
+            if book in target:
+                self.books[book] = book
+            elif len(source_books) == len(target_books):
+                self.books[book] = target_books[i]
+
+        for book, eng_chapters, heb_chapters, eng_chapter, first, last, heb_chapter, heb_first in _CHAPTER_SHIFTS:
+            if book not in self.books:
+                continue
+            src, dst = len(source.get(book, [])), len(target.get(self.books[book], []))
+            if (src, dst) == (eng_chapters, heb_chapters):
+                for verse in range(first, last+1):
+                    self.verses[(book, eng_chapter, verse)] = (heb_chapter, heb_first + verse - first)
+            elif (src, dst) == (heb_chapters, eng_chapters):
+                for verse in range(first, last+1):
+                    self.verses[(book, heb_chapter, heb_first + verse - first)] = (eng_chapter, verse)
+
+        # A numbered title shifts the whole psalm, only where the verse counts differ by exactly the title
+        if _PSALMS in self.books:
+            src, dst = source[_PSALMS], target[self.books[_PSALMS]]
+            for chapter, title in _PSALM_TITLES.items():
+                if chapter <= min(len(src), len(dst)) and abs(dst[chapter-1] - src[chapter-1]) == title:
+                    self.offsets[(_PSALMS, chapter)] = dst[chapter-1] - src[chapter-1]
+
+    def map(self, reference: Reference) -> Reference | None:
+        """The same verse in the target module | None when it has no counterpart, eg. a numbered psalm title"""
+        book, chapter, verse = reference
+        if book not in self.books:
+            return None
+        if (book, chapter, verse) in self.verses:
+            chapter, verse = self.verses[(book, chapter, verse)]
+        verse += self.offsets.get((book, chapter), 0)
+        if verse < 1:
+            return None
+        return (self.books[book], chapter, verse)
+
+class ParallelLoader(QRunnable):
+    def __init__(self, parallel: "ParallelVerses", request_id: int, reference: Reference, names: list[str]):
+        super().__init__()
+        self.parallel = parallel
+        self.request_id = request_id
+        self.reference = reference
+        self.names = names
+
+    def run(self):
+        try:
+            self.parallel.ready.emit(self.request_id, self.parallel.lookup(self.reference, self.names, load=True))
+        except Exception as e:
+            print(f"Parallel lookup of {self.reference} failed: {e}")
+
+class ParallelVerses(QObject):
+    """Fetches the same verse from several modules, off the GUI thread unless everything is cached"""
+    ready = Signal(int, object)
+    """(request id, list of (module, verse number, text))"""
+
+    def __init__(self, cache: ChapterCache, prefetcher: Prefetcher, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pool = prefetcher.pool
+        self._counts: dict[str, dict[int, list[int]]] = {}
+        self._alignments: dict[tuple[str, str], Alignment] = {}
+        self._lock = threading.Lock()
+        self.request_id = 0
+
+    def forget(self):
+        """Drop the computed alignments, eg. after modules were downloaded again"""
+        with self._lock:
+            self._counts.clear()
+            self._alignments.clear()
+
+    def _alignment(self, source: str, target: str, load: bool) -> Alignment | None:
+        with self._lock:
+            alignment = self._alignments.get((source, target))
+            if alignment is not None or not load:
+                return alignment
+        for name in (source, target):
+            if name not in self._counts:
+                cursor, sidecar = thread_cursor(name)
+                counts = count_verses(name, cursor, sidecar)
+                with self._lock:
+                    self._counts[name] = counts
+        alignment = Alignment(self._counts[source], self._counts[target])
+        with self._lock:
+            self._alignments[(source, target)] = alignment
+        return alignment
+
+    def lookup(self, reference: Reference, names: list[str], load: bool) -> list[tuple[str, int, str]] | None:
+        """Aligned verse of every module | without load returns None unless all of it is cached"""
+        source = names[0]
+        result: list[tuple[str, int, str]] = []
+        for name in names:
+            alignment = self._alignment(source, name, load)
+            if alignment is None:
+                return None
+            mapped = alignment.map(reference)
+            if mapped is None:
+                result.append((name, 0, ""))
+                continue
+            book, chapter, verse = mapped
+            verses = self.cache.get((name, book, chapter))
+            if verses is None:
+                if not load:
+                    return None
+                cursor, sidecar = thread_cursor(name)
+                verses = load_chapter(name, cursor, book, chapter, sidecar)
+                self.cache.put((name, book, chapter), verses)
+            text = [t for v, t in verses if v == verse]
+            result.append((name, verse, text[0] if text else ""))
+        return result
+
+    def request(self, reference: Reference, names: list[str]) -> int:
+        """Emits ready with the new request id, synchronously when every chapter is cached | older requests are superseded"""
+        self.request_id += 1
+        cached = self.lookup(reference, names, load=False)
+        if cached is not None:
+            self.ready.emit(self.request_id, cached)
+        else:
+            self.pool.start(ParallelLoader(self, self.request_id, reference, names))
+        return self.request_id
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+from PySide6.QtCore import QRunnable, QThreadPool
+from database.chapter_cache import ChapterCache, ChapterKey, load_chapter
+from database.registry import connect_readonly
+from database.sidecar import is_fresh, sidecar_path
+from utils.file_manager import book_path
+
+_cursors: dict[tuple[int, str], tuple[sqlite3.Cursor, bool, int]] = {}
+"""(thread id, module) -> (cursor, is sidecar, generation) | the loader pool never expires its threads, so an entry lives as long as its thread"""
+_generations: dict[str, int] = {}
+"""Bumped by close_cursors, a cursor of an older generation is reopened by its own thread"""
+_cursors_lock = threading.Lock()
+
+def thread_cursor(name: str) -> tuple[sqlite3.Cursor, bool]:
+    """Read-only cursor owned by the calling loader thread | returns (cursor, is sidecar)"""
+    key = (threading.get_ident(), name)
+    with _cursors_lock:
+        entry = _cursors.get(key)
+        generation = _generations.get(name, 0)
+    if entry is not None:
+        cursor, sidecar, opened = entry
+        if opened == generation:
+            return cursor, sidecar
+        # sqlite connections are closed by the thread that uses them
+        cursor.connection.close()
+    sidecar = is_fresh(name)
+    path = sidecar_path(name) if sidecar else book_path(name)
+    cursor = connect_readonly(path).cursor()
+    with _cursors_lock:
+        _cursors[key] = (cursor, sidecar, generation)
+    return cursor, sidecar
+
+def close_cursors(name: str | None = None):
+    """Make the loader threads reopen a module (every module when name is None), eg. after it was downloaded or rebuilt"""
+    with _cursors_lock:
+        names = [name] if name is not None else list({key[1] for key in _cursors})
+        for module in names:
+            _generations[module] = _generations.get(module, 0) + 1
+
+class ChapterLoader(QRunnable):
+    def __init__(self, prefetcher: "Prefetcher", key: ChapterKey):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.key = key
+
+    def run(self):
+        bible, book, chapter = self.key
+        try:
+            if self.key not in self.prefetcher.cache:
+                cursor, sidecar = thread_cursor(bible)
+                self.prefetcher.cache.put(self.key, load_chapter(bible, cursor, book, chapter, sidecar))
+        except Exception as e:
+            print(f"Prefetch of {bible} {book}:{chapter} failed: {e}")
+        finally:
+            self.prefetcher.done(self.key)
+
+class Prefetcher:
+    """Warms the chapter cache on a background thread pool"""
+    def __init__(self, cache: ChapterCache, max_threads: int = 2):
+        self.cache = cache
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        # An expired thread would leave its connections behind in _cursors
+        self.pool.setExpiryTimeout(-1)
+        self._pending: set[ChapterKey] = set()
+        self._lock = threading.Lock()
+
+    def request(self, key: ChapterKey):
+        with self._lock:
+            if key in self._pending or key in self.cache:
+                return
+            self._pending.add(key)
+        self.pool.start(ChapterLoader(self, key))
+
+    def done(self, key: ChapterKey):
+        with self._lock:
+            self._pending.discard(key)
+
+    def around(self, bible: str, book: int, chapter: int, chapter_count: int, other_bibles: list[str], neighbours: bool = True):
+        """Next and previous chapter of the module, then the same chapter in the other modules"""
+        if neighbours and chapter < chapter_count:
+            self.request((bible, book, chapter+1))
+        if neighbours and chapter > 1:
+            self.request((bible, book, chapter-1))
+        for other in other_bibles:
+            if other != bible:
+                self.request((other, book, chapter))
@@ -0,0 +1,50 @@
+from collections.abc import Sequence
+from ui.models import format_verse
+from ui.render import READING_PX, pack_slides
+
+class Slide:
+    def __init__(self, first: int, last: int, text: str, footer: str):
+        self.first = first
+        """Verse number of the first verse on the slide"""
+        self.last = last
+        self.text = text
+        self.footer = footer
+
+class Reading:
+    """A verse range packed into slides up front, stepping is a list index"""
+    def __init__(self, slides: list[Slide]):
+        self.slides = slides
+        self.position = -1
+
+    def current(self) -> Slide | None:
+        return self.slides[self.position] if 0 <= self.position < len(self.slides) else None
+
+    def go(self, position: int) -> Slide | None:
+        if 0 <= position < len(self.slides):
+            self.position = position
+        return self.current()
+
+    def next(self) -> Slide | None:
+        """The following slide, None at the end of the reading"""
+        return self.go(self.position + 1) if self.position + 1 < len(self.slides) else None
+
+    def prev(self) -> Slide | None:
+        return self.go(self.position - 1) if self.position > 0 else None
+
+    def peek(self) -> Slide | None:
+        return self.slides[self.position + 1] if self.position + 1 < len(self.slides) else None
+
+    def __len__(self) -> int:
+        return len(self.slides)
+
+def make_reading(rows: Sequence[tuple[int, str]], first: int, last: int, prefix: str,
+                 width: int, height: int, family: str, px: int = READING_PX) -> Reading:
+    """Verses first..last of a chapter as slides fitting a width x height screen, footers like "Rom 8:28-30" """
+    verses = [(verse, text) for verse, text in rows if first <= verse <= last]
+    texts = [format_verse(verse, text) for verse, text in verses]
+    slides: list[Slide] = []
+    for start, end in pack_slides(texts, width, height, family, px):
+        first_verse, last_verse = verses[start][0], verses[end-1][0]
+        numbers = f"{first_verse}-{last_verse}" if last_verse != first_verse else str(first_verse)
+        slides.append(Slide(first_verse, last_verse, "\n".join(texts[start:end]), f"{prefix}:{numbers}"))
+    return Reading(slides)
@@ -0,0 +1,103 @@
+import re
+from bisect import bisect_left
+from typing import Protocol
+from utils.text import fold
+
+class BookName(Protocol):
+    id: int
+    short_name: str
+    long_name: str
+
+# Common names and abbreviations by MyBible book number, besides the ones in the module itself
+ALIASES: dict[int, list[str]] = {
+    10: ["gen", "genesis", "1moz", "1mozes"], 20: ["ex", "exo", "exodus", "2moz", "2mozes"],
+    30: ["lev", "leviticus", "3moz", "3mozes"], 40: ["num", "numbers", "4moz", "4mozes"],
+    50: ["deut", "deuteronomy", "5moz", "5mozes"], 60: ["josh", "joshua", "jozs", "jozsue"],
+    70: ["judg", "judges", "bir", "birak"], 80: ["ruth", "rut"],
+    90: ["1sam", "1samuel"], 100: ["2sam", "2samuel"], 110: ["1kgs", "1kings", "1kir", "1kiralyok"],
+    120: ["2kgs", "2kings", "2kir", "2kiralyok"], 130: ["1chr", "1chronicles", "1kron", "1kronika"],
+    140: ["2chr", "2chronicles", "2kron", "2kronika"], 150: ["ezra", "ezsd", "ezsdras"],
+    160: ["neh", "nehemiah", "nehemias"], 190: ["esth", "esther", "eszt", "eszter"],
+    220: ["job"], 230: ["ps", "psa", "psalm", "psalms", "zsolt", "zsoltarok"],
+    240: ["prov", "proverbs", "peld", "peldabeszedek"], 250: ["eccl", "ecclesiastes", "pred", "predikator"],
+    260: ["song", "songofsongs", "enek", "enekekeneke"], 290: ["isa", "isaiah", "ezs", "ezsaias"],
+    300: ["jer", "jeremiah", "jeremias"], 310: ["lam", "lamentations", "jsir", "siralmak"],
+    330: ["ezek", "ezekiel", "ez"], 340: ["dan", "daniel"], 350: ["hos", "hosea", "hoseas"],
+    360: ["joel", "jo"], 370: ["amos", "am"], 380: ["obad", "obadiah", "abd", "abdias"],
+    390: ["jonah", "jon", "jonas"], 400: ["mic", "micah", "mik", "mikeas"], 410: ["nah", "nahum"],
+    420: ["hab", "habakkuk"], 430: ["zeph", "zephaniah", "sof", "sofonias"], 440: ["hag", "haggai", "agg", "aggeus"],
+    450: ["zech", "zechariah", "zak", "zakarias"], 460: ["mal", "malachi", "malakias"],
+    470: ["matt", "mt", "matthew", "mate"], 480: ["mk", "mark", "mar"],
+    490: ["lk", "luke", "lukacs"], 500: ["jn", "john", "jan", "janos"],
+    510: ["acts", "apcsel", "apostolok"], 520: ["rom", "romans", "romaiakhoz"],
+    530: ["1cor", "1corinthians", "1kor", "1korinthusiakhoz"], 540: ["2cor", "2corinthians", "2kor", "2korinthusiakhoz"],
+    550: ["gal", "galatians", "galatakhoz"], 560: ["eph", "ephesians", "ef", "efezusiakhoz"],
+    570: ["phil", "philippians", "fil", "filippiekhez"], 580: ["col", "colossians", "kol", "kolosseiakhoz"],
+    590: ["1thess", "1thessalonians", "1thessz"], 600: ["2thess", "2thessalonians", "2thessz"],
+    610: ["1tim", "1timothy", "1timoteus"], 620: ["2tim", "2timothy", "2timoteus"],
+    630: ["titus", "tit", "titusz"], 640: ["phlm", "philemon", "filem", "filemon"],
+    650: ["heb", "hebrews", "zsid", "zsidokhoz"], 660: ["jas", "james", "jak", "jakab"],
+    670: ["1pet", "1peter", "1pt"], 680: ["2pet", "2peter", "2pt"],
+    690: ["1jn", "1john", "1jan", "1janos"], 700: ["2jn", "2john", "2jan", "2janos"],
+    710: ["3jn", "3john", "3jan", "3janos"], 720: ["jude", "jud", "judas"],
+    730: ["rev", "revelation", "jel", "jelenesek"],
+}
+
+_REFERENCE = re.compile(r"^\s*(\d?\s*[^\W\d][^\d]*?)\s*(?:(\d+)\s*(?:[:,.]\s*(\d+)\s*(?:-\s*(\d+))?)?)?\s*$")
+_KEY_JUNK = re.compile(r"[\s.]+")
+
+class Reference:
+    def __init__(self, book: int, chapter: int | None = None, verse: int | None = None, verse_end: int | None = None):
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        self.verse_end = verse_end
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Reference) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        return f"Reference({self.book}, {self.chapter}, {self.verse}, {self.verse_end})"
+
+def name_key(name: str) -> str:
+    """Folded name without spaces and dots, "1 Móz." -> "1moz" """
+    return _KEY_JUNK.sub("", fold(name))
+
+class ReferenceIndex:
+    """Sorted index of book names and aliases for prefix lookups"""
+    def __init__(self, books: list[BookName]):
+        pairs: set[tuple[str, int]] = set()
+        for book in books:
+            for name in [book.short_name, book.long_name, *ALIASES.get(book.id, [])]:
+                key = name_key(name)
+                if key:
+                    pairs.add((key, book.id))
+        self._entries = sorted(pairs)
+        self._keys = [key for key, _ in self._entries]
+
+    def find_book(self, name: str) -> int | None:
+        """Book id of an exact name, or of a prefix shared by a single book"""
+        key = name_key(name)
+        if not key:
+            return None
+        start = bisect_left(self._keys, key)
+        matches: set[int] = set()
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(key):
+                break
+            if self._keys[i] == key:
+                return self._entries[i][1]
+            matches.add(self._entries[i][1])
+        return matches.pop() if len(matches) == 1 else None
+
+    def parse(self, text: str) -> Reference | None:
+        """Parse "Jn", "Jn 3", "Jn 3:16" or "Jn 3:16-18" """
+        match = _REFERENCE.match(text)
+        if match is None:
+            return None
+        name, chapter, verse, verse_end = match.groups()
+        book = self.find_book(name)
+        if book is None:
+            return None
+        to_int = lambda value: int(value) if value else None
+        return Reference(book, to_int(chapter), to_int(verse), to_int(verse_end))
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+from PySide6.QtCore import QThread, Signal
+from database.corpus import ResidentCorpus, load_corpus
+from database.inspector import module_plans
+from database.sidecar import build_sidecar, ensure_sidecar, is_fresh, read_verse_counts, sidecar_path
+from utils.file_manager import book_path
+
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KIB = 16 * 1024
+SIDECAR_BOOKS = "SELECT book_number, short_name, long_name FROM books ORDER BY book_number"
+RESIDENT = os.environ.get("PROJECTOR_RESIDENT", "") not in ("", "0")
+"""Keep the whole text of opened modules in memory instead of reading chapters from SQLite"""
+
+def connect_readonly(path: Path) -> sqlite3.Connection:
+    """Read-only connection tuned for repeated lookups in a file that never changes under it"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+def count_verses(name: str, cursor: sqlite3.Cursor, sidecar: bool) -> dict[int, list[int]]:
+    """Verse count of every chapter per book, in one aggregate query"""
+    if sidecar:
+        rows = read_verse_counts(cursor)
+    else:
+        cursor.execute(module_plans(name)["counts"])
+        rows = cursor.fetchall()
+    counts: dict[int, list[int]] = {}
+    for book, _, count in rows:
+        counts.setdefault(int(book), []).append(count)
+    return counts
+
+class ModuleHandle:
+    def __init__(self, name: str, connection: sqlite3.Connection, sidecar: bool, resident: bool = False):
+        self.name = name
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.sidecar = sidecar
+        """The connection points to the pre-cleaned sidecar instead of the module itself"""
+        self.verse_counts = count_verses(name, self.cursor, sidecar)
+        self.books_query = SIDECAR_BOOKS if sidecar else module_plans(name)["books"]
+        """books and books_all differ between modules, the sidecar always has books"""
+        self.corpus: ResidentCorpus | None = None
+        if resident:
+            try:
+                self.corpus = load_corpus(name, self.cursor, sidecar)
+            except (ValueError, TypeError) as e:
+                # Chapters are then read from SQLite as without PROJECTOR_RESIDENT
+                print(f"Could not keep {name} in memory: {e}", file=sys.stderr)
+            else:
+                # stderr keeps the json of --startup-time and the benchmarks clean
+                print(self.corpus, file=sys.stderr)
+
+    def close(self):
+        self.cursor.close()
+        self.connection.close()
+
+class ModuleRegistry:
+    """Lazily opened read-only handles of the installed modules, least recently used closed first"""
+    def __init__(self, max_open: int = 4, on_rebuild: Callable[[str], None] | None = None, resident: bool = RESIDENT):
+        self.max_open = max_open
+        self.on_rebuild = on_rebuild
+        self.resident = resident
+        self._handles: OrderedDict[str, ModuleHandle] = OrderedDict()
+
+    def get(self, name: str) -> ModuleHandle:
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = self._open(name)
+            self._handles[name] = handle
+            while len(self._handles) > self.max_open:
+                self._handles.popitem(last=False)[1].close()
+        self._handles.move_to_end(name)
+        return handle
+
+    def _open(self, name: str) -> ModuleHandle:
+        try:
+            if is_fresh(name):
+                path = sidecar_path(name)
+            else:
+                if self.on_rebuild is not None:
+                    self.on_rebuild(name)
+                path = build_sidecar(name)
+            return ModuleHandle(name, connect_readonly(path), True, self.resident)
+        except Exception as e:
+            print(f"Could not build index for {name}, reading module directly: {e}")
+            return ModuleHandle(name, connect_readonly(book_path(name)), False, self.resident)
+
+    def close(self, name: str):
+        handle = self._handles.pop(name, None)
+        if handle is not None:
+            handle.close()
+
+    def close_all(self):
+        while self._handles:
+            self._handles.popitem()[1].close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handles
+
+class ModuleOpener(QThread):
+    """Builds a stale sidecar off the GUI thread, so opening the module afterwards is quick"""
+    opened = Signal(str)
+
+    def __init__(self, name: str, parent=None):
+        super().__init__(parent)
+        self.name = name
+
+    def run(self):
+        try:
+            ensure_sidecar(self.name)
+        except Exception as e:
+            # The registry retries and falls back to the module itself
+            print(f"Could not prepare {self.name}: {e}")
+        self.opened.emit(self.name)
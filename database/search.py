@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Signal
+from database.inspector import module_plans
+from database.sidecar import read_meta, source_stamp, stamp_matches
+from utils.file_manager import CACHE_DIR, book_path
+from utils.text import clean_verse_text, tokens
+from utils.trace import traced
+
+INDEX_VERSION = 1
+TOKENIZER = "unicode61 remove_diacritics 2"
+"""Indexed words are folded by FTS5 itself, utils.text.tokens folds the query words the same way"""
+SEARCH_DELAY_MS = 250
+"""Typing pause before the query runs"""
+MIN_QUERY_LENGTH = 2
+MIN_PREFIX_LENGTH = 3
+"""A shorter last word is matched whole, as a prefix it would match most of the index"""
+
+class SearchResult:
+    def __init__(self, bible: str, book_number: int, short_name: str, chapter: int, verse: int, text: str, score: float):
+        self.bible = bible
+        self.book_number = book_number
+        self.short_name = short_name
+        self.chapter = chapter
+        self.verse = verse
+        self.text = text
+        self.score = score
+
+    def get_full_name(self) -> str:
+        return f"[{self.bible}] {self.short_name} {self.chapter}:{self.verse}  {self.text}"
+
+def index_path(name: str) -> Path:
+    return CACHE_DIR / f"{name}.search.SQLite3"
+
+def is_indexed(name: str) -> bool:
+    """Index is complete and built from the current module file"""
+    path = index_path(name)
+    if not path.exists():
+        return False
+    try:
+        meta = read_meta(path)
+    except sqlite3.Error:
+        return False
+    return meta.get("version") == str(INDEX_VERSION) and meta.get("complete") == "1" and stamp_matches(meta, name, path)
+
+def build_index(name: str, should_stop=lambda: False) -> bool:
+    """Index the module one book per transaction | an interrupted build resumes after the last finished book"""
+    path = index_path(name)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = source_stamp(name)
+    plans = module_plans(name)
+    if path.exists():
+        try:
+            meta = read_meta(path)
+        except sqlite3.Error:
+            meta = {}
+        if meta.get("version") != str(INDEX_VERSION) or meta.get("checksum") != stamp["checksum"]:
+            os.remove(path)
+
+    src = sqlite3.connect(f"file:{book_path(name)}?mode=ro", uri=True)
+    dst = sqlite3.connect(path)
+    try:
+        dst.executescript(f"""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS books (book_number INTEGER PRIMARY KEY, short_name TEXT, indexed INTEGER DEFAULT 0);
+            CREATE VIRTUAL TABLE IF NOT EXISTS verse_index USING fts5(
+                text, book_number UNINDEXED, chapter UNINDEXED, verse UNINDEXED,
+                tokenize = '{TOKENIZER}'
+            );
+        """)
+        with dst:
+            dst.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [("version", str(INDEX_VERSION)), ("complete", "0"), *stamp.items()])
+            dst.executemany("INSERT OR IGNORE INTO books (book_number, short_name) VALUES (?, ?)",
+                            [(int(b), short) for b, short, _ in src.execute(plans["books"])])
+
+        todo = [b for (b,) in dst.execute("SELECT book_number FROM books WHERE indexed = 0 ORDER BY book_number")]
+        for book in todo:
+            if should_stop():
+                return False
+            rows = src.execute(plans["book_verses"], (book,))
+            with dst:
+                dst.executemany("INSERT INTO verse_index VALUES (?, ?, ?, ?)",
+                                ((clean_verse_text(text or ""), book, int(chapter), int(verse)) for chapter, verse, text in rows))
+                dst.execute("UPDATE books SET indexed = 1 WHERE book_number = ?", (book,))
+        with dst:
+            dst.execute("INSERT INTO verse_index(verse_index) VALUES ('optimize')")
+            dst.execute("UPDATE meta SET value = '1' WHERE name = 'complete'")
+        return True
+    finally:
+        src.close()
+        dst.close()
+
+def to_match_query(text: str) -> str:
+    """Every word must match, the last one as a prefix so results follow typing"""
+    words = list(tokens(text))
+    if sum(len(w) for w in words) < MIN_QUERY_LENGTH:
+        return ""
+    quoted = [f'"{w}"' for w in words]
+    if len(words[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+class SearchLoader(QRunnable):
+    def __init__(self, engine: "SearchEngine", request_id: int, text: str, names: list[str]):
+        super().__init__()
+        self.engine = engine
+        self.request_id = request_id
+        self.text = text
+        self.names = names
+
+    def run(self):
+        try:
+            results = self.engine.search(self.text, self.names, lambda: self.request_id != self.engine.request_id)
+            if results is not None:
+                self.engine.ready.emit(self.request_id, results)
+        except Exception as e:
+            print(f"Search for {self.text!r} failed: {e}")
+
+class SearchEngine(QObject):
+    """Ranked full-text verse search over the indexes of all installed modules, off the GUI thread"""
+    ready = Signal(int, object)
+    """(request id, list of SearchResult)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # One thread that never expires owns every index connection
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.pool.setExpiryTimeout(-1)
+        self.request_id = 0
+        self._connections: dict[str, sqlite3.Connection] = {}
+        self._stale: set[str] = set()
+        """Modules whose connection the search thread closes before its next query"""
+        self._running: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self, name: str) -> sqlite3.Connection | None:
+        with self._lock:
+            stale, self._stale = self._stale, set()
+        for module in stale:
+            conn = self._connections.pop(module, None)
+            if conn is not None:
+                conn.close()
+        if name not in self._connections:
+            if not is_indexed(name):
+                return None
+            self._connections[name] = sqlite3.connect(f"file:{index_path(name)}?mode=ro", uri=True)
+        return self._connections[name]
+
+    def forget(self, name: str):
+        """Close the index of the module, eg. before it is rebuilt"""
+        with self._lock:
+            self._stale.add(name)
+
+    def request(self, text: str, names: list[str]) -> int:
+        """Search on the background thread, ready is emitted with the new request id | older requests are superseded"""
+        self.request_id += 1
+        with self._lock:
+            if self._running is not None:
+                # The superseded query stops at its next step instead of finishing
+                self._running.interrupt()
+        self.pool.start(SearchLoader(self, self.request_id, text, names))
+        return self.request_id
+
+    @traced("search.search")
+    def search(self, text: str, names: list[str], superseded=lambda: False, limit: int = 50) -> list[SearchResult] | None:
+        """Best matches of every module in the order of names, each ranked within its own index | None when superseded
+
+        bm25 scores depend on the statistics of the index they come from, so they are not compared across modules.
+        """
+        query = to_match_query(text)
+        if not query:
+            return []
+        results: list[SearchResult] = []
+        for name in names:
+            if superseded():
+                return None
+            conn = self._connection(name)
+            if conn is None:
+                continue
+            with self._lock:
+                self._running = conn
+            try:
+                rows = conn.execute("""
+                    SELECT v.book_number, b.short_name, v.chapter, v.verse, v.text, bm25(verse_index)
+                    FROM verse_index v JOIN books b ON b.book_number = v.book_number
+                    WHERE verse_index MATCH ? ORDER BY rank LIMIT ?
+                """, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                if superseded():
+                    return None
+                raise
+            finally:
+                with self._lock:
+                    self._running = None
+            results.extend(SearchResult(name, *row) for row in rows)
+        return None if superseded() else results
+
+class SearchIndexWorker(QThread):
+    progress = Signal(str)
+    """Name of the module whose index was finished"""
+
+    def __init__(self, names: list[str], parent=None):
+        super().__init__(parent)
+        self.names = names
+
+    def run(self):
+        for name in self.names:
+            if self.isInterruptionRequested():
+                return
+            try:
+                if not is_indexed(name) and build_index(name, self.isInterruptionRequested):
+                    self.progress.emit(name)
+            except Exception as e:
+                print(f"Indexing {name} failed: {e}")
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from database.inspector import module_plans
+from utils.file_manager import CACHE_DIR, book_path
+from utils.text import clean_verse_text
+
+SIDECAR_VERSION = 1
+"""Bump when the sidecar layout or the text cleaning changes"""
+
+def sidecar_path(name: str) -> Path:
+    return CACHE_DIR / f"{name}.index.SQLite3"
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_meta(path: Path) -> dict[str, str]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute("SELECT name, value FROM meta").fetchall())
+    finally:
+        conn.close()
+
+def is_fresh(name: str) -> bool:
+    """Sidecar exists, has the current version and was built from the current module file"""
+    path = sidecar_path(name)
+    if not path.exists():
+        return False
+    try:
+        meta = read_meta(path)
+    except sqlite3.Error:
+        return False
+    if meta.get("version") != str(SIDECAR_VERSION):
+        return False
+    return stamp_matches(meta, name, path)
+
+def source_stamp(name: str) -> dict[str, str]:
+    """Size, mtime and checksum of the module file, stored in derived files to detect staleness"""
+    source = book_path(name)
+    stat = source.stat()
+    return {"size": str(stat.st_size), "mtime": str(stat.st_mtime_ns), "checksum": file_checksum(source)}
+
+def stamp_matches(meta: dict[str, str], name: str, path: Path) -> bool:
+    """Whether the derived file at path was built from the current module | a touched or copied module
+    with the same content gets its new size and mtime written back, so it is hashed only once"""
+    source = book_path(name)
+    stat = source.stat()
+    if meta.get("size") == str(stat.st_size) and meta.get("mtime") == str(stat.st_mtime_ns):
+        return True
+    if meta.get("checksum") != file_checksum(source):
+        return False
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                conn.executemany("UPDATE meta SET value = ? WHERE name = ?",
+                                 [(str(stat.st_size), "size"), (str(stat.st_mtime_ns), "mtime")])
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Could not update the stamp of {path.name}: {e}")
+    return True
+
+def build_sidecar(name: str) -> Path:
+    """Write cleaned verses, the chapter offset table and chapter counts next to the module"""
+    source = book_path(name)
+    path = sidecar_path(name)
+    tmp_path = path.with_suffix(".tmp")
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    stamp = source_stamp(name)
+    plans = module_plans(name)
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        dst.executescript("""
+            CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE books (book_number INTEGER PRIMARY KEY, short_name TEXT, long_name TEXT, chapters INTEGER);
+            CREATE TABLE verses (id INTEGER PRIMARY KEY, verse INTEGER, text TEXT);
+            CREATE TABLE chapters (
+                book_number INTEGER, chapter INTEGER, first_id INTEGER, verse_count INTEGER,
+                PRIMARY KEY (book_number, chapter)
+            ) WITHOUT ROWID;
+        """)
+        chapters: dict[tuple[int, int], list[int]] = {}
+
+        def verses():
+            # Streamed into the insert, the module is never held in memory as a whole
+            rows = src.execute(plans["all_verses"])
+            for verse_id, (book_number, chapter, verse, text) in enumerate(rows, start=1):
+                key = (int(book_number), int(chapter))
+                if key in chapters:
+                    chapters[key][1] += 1
+                else:
+                    chapters[key] = [verse_id, 1]
+                yield (verse_id, int(verse), clean_verse_text(text or ""))
+        dst.executemany("INSERT INTO verses VALUES (?, ?, ?)", verses())
+        dst.executemany("INSERT INTO chapters VALUES (?, ?, ?, ?)",
+                        [(book, chapter, first, count) for (book, chapter), (first, count) in chapters.items()])
+
+        chapter_counts: dict[int, int] = {}
+        for book, _ in chapters:
+            chapter_counts[book] = chapter_counts.get(book, 0) + 1
+        books = src.execute(plans["books"]).fetchall()
+        dst.executemany("INSERT INTO books VALUES (?, ?, ?, ?)",
+                        [(int(b), short, long, chapter_counts.get(int(b), 0)) for b, short, long in books])
+
+        dst.executemany("INSERT INTO meta VALUES (?, ?)",
+                        [("version", str(SIDECAR_VERSION)), ("source", name), *stamp.items()])
+        dst.commit()
+    finally:
+        src.close()
+        dst.close()
+    os.replace(tmp_path, path)
+    return path
+
+def ensure_sidecar(name: str) -> Path:
+    """Return the sidecar of the module, rebuilding it when missing or stale"""
+    if is_fresh(name):
+        return sidecar_path(name)
+    return build_sidecar(name)
+
+def read_chapter(cursor: sqlite3.Cursor, book_index: int, chapter_index: int) -> list[tuple[int, str]]:
+    cursor.execute("""
+        SELECT v.verse, v.text FROM chapters c
+        JOIN verses v ON v.id >= c.first_id AND v.id < c.first_id + c.verse_count
+        WHERE c.book_number = ? AND c.chapter = ?
+        ORDER BY v.id
+    """, (book_index, chapter_index))
+    return cursor.fetchall()
+
+def read_verse_counts(cursor: sqlite3.Cursor) -> list[tuple[int, int, int]]:
+    """(book_number, chapter, verse_count) rows of the whole module"""
+    cursor.execute("SELECT book_number, chapter, verse_count FROM chapters ORDER BY book_number, chapter")
+    return cursor.fetchall()
@@ -1,30 +1,55 @@
+import time
+START = time.perf_counter()
+"""Reference point of --startup-time, taken before the Qt imports"""
+
+import json
 import sys
 from PySide6.QtUiTools import QUiLoader
 from PySide6.QtWidgets import QApplication, QWidget
-from PySide6.QtCore import QFile, QIODevice, QRect
+from PySide6.QtCore import QEvent, QFile, QIODevice, QObject, QTimer
+from database import bible
 from database.bible import init
+from session.restore import restore_geometry, restore_navigation
+from session.snapshot import load_snapshot
 from ui.screen import ShowScreen
-    
+
+IMPORTED = time.perf_counter()
+
 class MainApp:
     def __init__(self):
         self.load_main_window()
         self.second_window = ShowScreen()
+        self.snapshot = load_snapshot()
+        # The restored module is opened first and its chapter is read while the window is built
+        restore_navigation(self.snapshot)
+        restore_geometry(self.main_window, self.snapshot)
+        # Only wiring happens here, modules and songs are opened after the window is shown
         init(self.main_window,self.second_window)
-
-        screens = QApplication.screens()
-        screens.remove(self.main_window.screen())
-        if len(screens)<1:
-            self.second_window.setGeometry(QRect(50,50,800,400))
-            self.second_window.show_header()
-        else:
-            self.second_window.setGeometry(screens[0].geometry())
-            self.second_window.hide_header()
-        
+        self.displays = None
+        """DisplayManager, set once the panels are wired"""
+        # Songs, playlist, remote control, displays and session pull in most of the imports, they are wired after the first frame
+        self.first_frame = AfterFirstFrame(self.main_window, self.init_panels)
         self.main_window.show()
-        self.second_window.show()
 
+    def init_panels(self):
+        from songs.library import init as init_songs
+        from playlist.panel import init as init_playlist
+        from remote.control import init as init_remote
+        from session.control import init as init_session
+        from ui.displays import init as init_displays
+        from ui.trace_overlay import install as install_trace
+
+        init_songs(self.main_window, self.second_window)
+        init_playlist(self.main_window, self.second_window, self.snapshot)
+        install_trace(self.main_window)
+        init_remote(self.main_window, self.second_window)
+
+        self.displays = init_displays(self.main_window, self.second_window)
+        init_session(self.main_window, self.second_window, self.displays, self.snapshot)
+        self.displays.arrange()
 
     def load_main_window(self):
+        # QUiLoader is used on purpose, it built this window faster than the pyside6-uic output
         ui_file_name = "ui/mainwindow.ui"
         ui_file = QFile(ui_file_name)
         if not ui_file.open(QIODevice.ReadOnly): # type: ignore
@@ -34,9 +59,62 @@ class MainApp:
         self.main_window = loader.load(ui_file)
         ui_file.close()
 
+class AfterFirstFrame(QObject):
+    """Calls back on the event loop turn after the window was first painted"""
+    def __init__(self, window: QWidget, callback):
+        super().__init__(window)
+        self.callback = callback
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            QTimer.singleShot(0, self.callback)
+        return False
+
+class StartupTimer(QObject):
+    """--startup-time: prints milliseconds to the first painted frame and to the first opened module, then quits"""
+    def __init__(self, app: QApplication):
+        super().__init__(app)
+        self.app = app
+        self.marks: dict[str, float] = {"imports_ms": (IMPORTED - START) * 1000}
+        self.window: QWidget | None = None
+        app.installEventFilter(self)
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, (time.perf_counter() - START) * 1000)
+
+    def watch(self, main: MainApp):
+        self.mark("window_built_ms")
+        self.window = main.main_window
+        # The book list is filled on the GUI thread once the first module is open
+        bible.after_first_module(self.module_ready)
+
+    def module_ready(self):
+        if bible.opener is None:
+            # No module is installed
+            self.marks.setdefault("module_ready_ms", None) # type: ignore
+        self.mark("module_ready_ms")
+        self.finish()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint and self.window is not None and isinstance(watched, QWidget) and watched.window() is self.window:
+            self.mark("first_frame_ms")
+            self.finish()
+        return False
+
+    def finish(self):
+        if "first_frame_ms" in self.marks and "module_ready_ms" in self.marks:
+            self.app.removeEventFilter(self)
+            print(json.dumps({name: round(value, 1) if value is not None else None for name, value in self.marks.items()}))
+            self.app.quit()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    timer = StartupTimer(app) if "--startup-time" in sys.argv else None
 
     main = MainApp()
-    
-    sys.exit(app.exec())
\ No newline at end of file
+    if timer is not None:
+        timer.watch(main)
+
+    sys.exit(app.exec())
@@ -0,0 +1,85 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable
+from PySide6.QtCore import QTimer
+from utils.file_manager import HISTORY_PATH
+
+SAVE_DELAY_MS = 2000
+
+class HistoryEntry:
+    """A projected verse with its text, so recalling it needs no lookup"""
+    def __init__(self, bible: str, book: int, chapter: int, verse: int, text: str, footer: str):
+        self.bible = bible
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        self.text = text
+        self.footer = footer
+
+    def key(self) -> tuple[str, int, int, int]:
+        return (self.bible, self.book, self.chapter, self.verse)
+
+    def __str__(self) -> str:
+        return f"[{self.bible}] {self.footer}"
+
+class VerseHistory:
+    """Recently projected verses, newest first | saved once stepping pauses, not on every verse"""
+    def __init__(self, path: Path = HISTORY_PATH, max_size: int = 100):
+        self.path = path
+        self.max_size = max_size
+        self.on_add: Callable[[int], None] | None = None
+        """Called with the row the newest entry was moved from, -1 for a new verse"""
+        self.on_clear: Callable[[], None] | None = None
+        self.entries: list[HistoryEntry] = []
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.save)
+        self.load()
+
+    def add(self, entry: HistoryEntry):
+        if self.entries and self.entries[0].key() == entry.key():
+            return
+        # A verse shown again moves to the top instead of appearing twice
+        moved_from = next((i for i, e in enumerate(self.entries) if e.key() == entry.key()), -1)
+        if moved_from >= 0:
+            del self.entries[moved_from]
+        self.entries.insert(0, entry)
+        del self.entries[self.max_size:]
+        self._save_timer.start()
+        if self.on_add is not None:
+            self.on_add(moved_from)
+
+    def clear(self):
+        self.entries = []
+        self._save_timer.start()
+        if self.on_clear is not None:
+            self.on_clear()
+
+    def flush(self):
+        """Save a pending change right away, eg. when the application quits"""
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self.save()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = [HistoryEntry(*row) for row in json.load(f)][:self.max_size]
+        except (OSError, ValueError, TypeError):
+            self.entries = []
+
+    def save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([[e.bible, e.book, e.chapter, e.verse, e.text, e.footer] for e in self.entries], f,
+                          ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save history: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
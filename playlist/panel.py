@@ -0,0 +1,164 @@
+from pathlib import Path
+from PySide6.QtWidgets import QWidget, QListWidget, QListWidgetItem, QLineEdit, QPushButton, QInputDialog, QFileDialog, QMessageBox
+from PySide6.QtCore import Qt
+from database import bible
+from playlist.queue import (CueQueue, PlaylistItem, SongItem, TextItem, VerseItem, item_from_row, load_playlist,
+                            resolve_playlist, save_playlist)
+from session.snapshot import Snapshot
+from songs import library
+from ui.screen import ShowScreen
+from utils.file_manager import PLAYLISTS_DIR
+
+ITEM_ROLE = Qt.ItemDataRole.UserRole
+
+queue = CueQueue([])
+"""Cues of the started playlist"""
+playlist_widget: QListWidget
+
+def items() -> list[PlaylistItem]:
+    """Items in the order shown, rows can be reordered by dragging"""
+    return [playlist_widget.item(i).data(ITEM_ROLE) for i in range(playlist_widget.count())]
+
+def init(window: QWidget, second_window: ShowScreen, snapshot: Snapshot | None = None):
+    global playlist_widget
+    playlist_widget = window.findChild(QListWidget, "playlistList") # type: ignore
+    cue_widget: QListWidget = window.findChild(QListWidget, "cueList") # type: ignore
+    history_widget: QListWidget = window.findChild(QListWidget, "historyList") # type: ignore
+    reference_edit: QLineEdit = window.findChild(QLineEdit, "referenceEdit") # type: ignore
+
+    def button(name: str) -> QPushButton:
+        return window.findChild(QPushButton, name) # type: ignore
+
+    button("btnPlaylistVerse").clicked.connect(lambda: add_verse())
+    button("btnPlaylistSong").clicked.connect(lambda: add_song())
+    button("btnPlaylistText").clicked.connect(lambda: add_text())
+    button("btnPlaylistRemove").clicked.connect(lambda: playlist_widget.takeItem(playlist_widget.currentRow()))
+    button("btnPlaylistOpen").clicked.connect(lambda: open_playlist())
+    button("btnPlaylistSave").clicked.connect(lambda: save())
+    button("btnPlaylistStart").clicked.connect(lambda: start())
+    button("btnCuePrev").clicked.connect(lambda: show_cue(queue.prev()))
+    button("btnCueNext").clicked.connect(lambda: show_cue(queue.next()))
+    cue_widget.currentRowChanged.connect(lambda row: show_cue(queue.go(row)) if row != queue.position else None)
+    playlist_widget.itemDoubleClicked.connect(lambda item: jump_to(playlist_widget.row(item)))
+    history_widget.itemClicked.connect(lambda item: recall(history_widget.row(item)))
+
+    def append(item: PlaylistItem):
+        row = QListWidgetItem(str(item))
+        row.setData(ITEM_ROLE, item)
+        playlist_widget.addItem(row)
+
+    def add_verse():
+        """The reference typed in the reference bar, or else the selected verse"""
+        reference = bible.reference_index.parse(reference_edit.text())
+        if reference is not None and reference.chapter is not None:
+            book, chapter, verse, verse_end = reference.book, reference.chapter, reference.verse, reference.verse_end
+        elif bible.current_chapter > 0:
+            book, chapter, verse, verse_end = bible.current_book, bible.current_chapter, bible.current_verse+1, None
+        else:
+            return
+        names = [b.short_name for b in bible.books if b.id == book]
+        chapter_label = f"{names[0] if names else book} {chapter}"
+        label = chapter_label
+        if verse is not None:
+            label += f":{verse}" + (f"-{verse_end}" if verse_end else "")
+        append(VerseItem(bible.current_bible, book, chapter, verse, verse_end, label, chapter_label))
+
+    def add_song():
+        song = library.current_song
+        if song is None or library.store is None:
+            return
+        uuid = library.store.get_uuid(song.id)
+        if uuid is not None:
+            append(SongItem(uuid, song.title))
+
+    def add_text():
+        text, ok = QInputDialog.getMultiLineText(window, "Playlist", "Text")
+        if ok and text.strip():
+            append(TextItem(text.strip()))
+
+    def open_playlist():
+        path, _ = QFileDialog.getOpenFileName(window, "Open playlist", str(PLAYLISTS_DIR), "Playlists (*.playlist)")
+        if not path:
+            return
+        try:
+            loaded = load_playlist(Path(path))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(window, "Open playlist", f"Could not open {path}: {e}")
+            return
+        playlist_widget.clear()
+        for item in loaded:
+            append(item)
+
+    def save():
+        PLAYLISTS_DIR.mkdir(parents=True, exist_ok=True)
+        path, _ = QFileDialog.getSaveFileName(window, "Save playlist", str(PLAYLISTS_DIR), "Playlists (*.playlist)")
+        if path:
+            save_playlist(items(), Path(path).with_suffix(".playlist"))
+
+    def start():
+        load_queue()
+        show_cue(queue.next())
+
+    def load_queue():
+        """Resolve every item up front, stepping through the service needs no database work after this"""
+        global queue
+        queue = CueQueue(resolve_playlist(items(), bible.read_chapter, library.store))
+        cue_widget.blockSignals(True)
+        cue_widget.clear()
+        cue_widget.addItems([f"{cue.footer}  {cue.text.splitlines()[0] if cue.text else ''}" for cue in queue.cues])
+        cue_widget.blockSignals(False)
+
+    def resume(position: int):
+        """Continue a restored service at its cue, the screen already shows it"""
+        load_queue()
+        queue.go(position)
+        cue_widget.blockSignals(True)
+        cue_widget.setCurrentRow(queue.position)
+        cue_widget.blockSignals(False)
+
+    def jump_to(item: int):
+        position = queue.first_of(item)
+        if position >= 0:
+            show_cue(queue.go(position))
+
+    def show_cue(cue):
+        if cue is None:
+            return
+        cue_widget.blockSignals(True)
+        cue_widget.setCurrentRow(queue.position)
+        cue_widget.blockSignals(False)
+        second_window.setText(cue.text, cue.footer)
+        following = queue.peek()
+        if following is not None:
+            second_window.prerender([following.text], following.footer)
+
+    def refresh_history():
+        history_widget.clear()
+        history_widget.addItems([str(entry) for entry in bible.history.entries])
+
+    def history_added(moved_from: int):
+        """Only the changed rows are touched, the list is updated on every projected verse"""
+        if moved_from >= 0:
+            history_widget.takeItem(moved_from)
+        history_widget.insertItem(0, str(bible.history.entries[0]))
+        while history_widget.count() > len(bible.history):
+            history_widget.takeItem(history_widget.count() - 1)
+
+    def recall(row: int):
+        if 0 <= row < len(bible.history):
+            entry = bible.history.entries[row]
+            second_window.setText(entry.text, entry.footer)
+
+    bible.history.on_add = history_added
+    bible.history.on_clear = refresh_history
+    refresh_history()
+
+    if snapshot is not None:
+        for row in snapshot.playlist:
+            try:
+                append(item_from_row(row))
+            except ValueError as e:
+                print(f"Could not restore playlist item {row}: {e}")
+        if snapshot.cue >= 0:
+            # Verse items are read from the modules, wait for the first one to be opened
+            bible.after_first_module(lambda: resume(snapshot.cue))
@@ -0,0 +1,166 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable
+from songs.store import SongStore
+from ui.models import format_verse
+
+FORMAT_VERSION = 1
+
+class VerseItem:
+    """Verse or verse range of a module, the whole chapter when verse is None"""
+    kind = "v"
+
+    def __init__(self, bible: str, book: int, chapter: int, verse: int | None = None, verse_end: int | None = None, label: str = "",
+                 chapter_label: str = ""):
+        self.bible = bible
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        self.verse_end = verse_end
+        self.label = label
+        """Eg. "Jn 3:16-18", shown in the playlist"""
+        # Rows saved before chapter_label was stored only have the label
+        self.chapter_label = chapter_label or label.split(":")[0]
+        """Eg. "Jn 3", the footer of every verse with the verse number appended"""
+
+    def to_row(self) -> list:
+        return [self.kind, self.bible, self.book, self.chapter, self.verse, self.verse_end, self.label, self.chapter_label]
+
+    def __str__(self) -> str:
+        return f"[{self.bible}] {self.label}"
+
+class SongItem:
+    kind = "s"
+
+    def __init__(self, uuid: str, title: str):
+        self.uuid = uuid
+        self.title = title
+
+    def to_row(self) -> list:
+        return [self.kind, self.uuid, self.title]
+
+    def __str__(self) -> str:
+        return f"♪ {self.title}"
+
+class TextItem:
+    """Free text, eg. an announcement"""
+    kind = "t"
+
+    def __init__(self, text: str, footer: str = ""):
+        self.text = text
+        self.footer = footer
+
+    def to_row(self) -> list:
+        return [self.kind, self.text, self.footer]
+
+    def __str__(self) -> str:
+        return self.text.splitlines()[0] if self.text.strip() else "(empty)"
+
+PlaylistItem = VerseItem | SongItem | TextItem
+
+_ITEM_TYPES: dict[str, Callable[..., PlaylistItem]] = {VerseItem.kind: VerseItem, SongItem.kind: SongItem, TextItem.kind: TextItem}
+
+class Cue:
+    """One projected screen of the resolved playlist"""
+    def __init__(self, text: str, footer: str, item: int):
+        self.text = text
+        self.footer = footer
+        self.item = item
+        """Index of the playlist item it was resolved from"""
+
+def save_playlist(items: list[PlaylistItem], path: Path):
+    """Compact json: one short array per item"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "items": [item.to_row() for item in items]}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def load_playlist(path: Path) -> list[PlaylistItem]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported playlist version: {data.get('version') if isinstance(data, dict) else None}")
+    if not isinstance(data.get("items"), list):
+        raise ValueError("The playlist has no items")
+    return [item_from_row(row) for row in data["items"]]
+
+def item_from_row(row: list) -> PlaylistItem:
+    """Inverse of to_row | raises ValueError for a malformed row or an unknown item kind"""
+    if not isinstance(row, list) or not row:
+        raise ValueError(f"Malformed playlist item: {row}")
+    item_type = _ITEM_TYPES.get(row[0])
+    if item_type is None:
+        raise ValueError(f"Unknown playlist item: {row[0]}")
+    try:
+        return item_type(*row[1:])
+    except TypeError as e:
+        raise ValueError(f"Malformed playlist item: {row}") from e
+
+ChapterReader = Callable[[str, int, int], list[tuple[int, str]]]
+"""(bible, book, chapter) -> cleaned (verse, text) rows"""
+
+def resolve_playlist(items: list[PlaylistItem], read_chapter: ChapterReader, store: SongStore | None) -> list[Cue]:
+    """Every screen of the playlist in order, each chapter read once and all songs in a single query"""
+    chapters: dict[tuple[str, int, int], list[tuple[int, str]]] = {}
+    for item in items:
+        if isinstance(item, VerseItem):
+            key = (item.bible, item.book, item.chapter)
+            if key not in chapters:
+                try:
+                    chapters[key] = read_chapter(*key)
+                except Exception as e:
+                    print(f"Could not read {item}: {e}")
+                    chapters[key] = []
+    uuids = list({item.uuid for item in items if isinstance(item, SongItem)})
+    songs = store.get_songs_by_uuid(uuids) if store is not None else {}
+
+    cues: list[Cue] = []
+    for i, item in enumerate(items):
+        if isinstance(item, VerseItem):
+            first = item.verse or 1
+            last = item.verse_end or item.verse or 1_000
+            for verse, text in chapters[(item.bible, item.book, item.chapter)]:
+                if first <= verse <= last:
+                    cues.append(Cue(format_verse(verse, text), f"{item.chapter_label}:{verse}", i))
+        elif isinstance(item, SongItem):
+            title, slides = songs.get(item.uuid, (item.title, []))
+            cues.extend(Cue(slide.text, title, i) for slide in slides)
+        else:
+            cues.append(Cue(item.text, item.footer, i))
+    return cues
+
+class CueQueue:
+    """Resolved cues with a cursor, stepping is a list index"""
+    def __init__(self, cues: list[Cue]):
+        self.cues = cues
+        self.position = -1
+
+    def current(self) -> Cue | None:
+        return self.cues[self.position] if 0 <= self.position < len(self.cues) else None
+
+    def go(self, position: int) -> Cue | None:
+        if 0 <= position < len(self.cues):
+            self.position = position
+        return self.current()
+
+    def next(self) -> Cue | None:
+        return self.go(self.position + 1)
+
+    def prev(self) -> Cue | None:
+        return self.go(self.position - 1)
+
+    def peek(self) -> Cue | None:
+        """The following cue, for pre-rendering"""
+        return self.cues[self.position + 1] if self.position + 1 < len(self.cues) else None
+
+    def first_of(self, item: int) -> int:
+        """Position of the first cue of a playlist item, -1 when it resolved to nothing"""
+        for position, cue in enumerate(self.cues):
+            if cue.item == item:
+                return position
+        return -1
+
+    def __len__(self) -> int:
+        return len(self.cues)
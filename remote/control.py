@@ -0,0 +1,46 @@
+import os
+from PySide6.QtWidgets import QApplication, QWidget, QListView, QLineEdit, QPushButton
+from PySide6.QtGui import QAction, QKeyEvent
+from PySide6.QtCore import QEvent, Qt
+from remote.server import RemoteServer
+from ui.screen import ShowScreen
+
+server: RemoteServer | None = None
+
+def init(window: QWidget, second_window: ShowScreen, port: int | None = None):
+    """Start the remote control when PROJECTOR_REMOTE is set to a port (or port is given)"""
+    global server
+    if port is None:
+        setting = os.environ.get("PROJECTOR_REMOTE", "")
+        if not setting.isdigit():
+            return
+        port = int(setting)
+
+    verse_list_view: QListView = window.findChild(QListView, "verseList") # type: ignore
+    reference_edit: QLineEdit = window.findChild(QLineEdit, "referenceEdit") # type: ignore
+    btn_next: QPushButton = window.findChild(QPushButton, "btnNext") # type: ignore
+    action_blank: QAction = window.findChild(QAction, "actionBlank") # type: ignore
+    action_black: QAction = window.findChild(QAction, "actionBlack") # type: ignore
+
+    def press(widget: QWidget, key: Qt.Key):
+        # Same path as the operator's keyboard, eg. the verse list key filter handles the arrows
+        QApplication.sendEvent(widget, QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier))
+
+    def jump(text: str):
+        reference_edit.setText(text)
+        press(reference_edit, Qt.Key.Key_Return)
+
+    handlers = {
+        "next": lambda _: btn_next.click(),
+        "prev": lambda _: press(verse_list_view, Qt.Key.Key_Up),
+        "blank": lambda _: action_blank.trigger(),
+        "black": lambda _: action_black.trigger(),
+        "reference": jump,
+    }
+
+    server = RemoteServer(lambda action, argument: handlers[action](argument), port=port, parent=window)
+    second_window.on_shown.append(lambda: server.publish(second_window.state()) if server is not None else None)
+    server.start()
+    if server.loop is not None:
+        print(f"Remote control on http://{server.host}:{server.port}/")
+        QApplication.instance().aboutToQuit.connect(server.stop) # type: ignore
@@ -0,0 +1,213 @@
+"""Local HTTP/WebSocket remote control, served by asyncio on its own thread
+
+GET  /            control page for a phone or tablet
+GET  /api/state   current screen as json
+POST /api/<action>          next, prev, blank, black
+POST /api/reference?q=Jn 3:16
+GET  /ws          websocket, pushes the state on every change and accepts {"action": ..., "argument": ...}
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
+from typing import Callable
+from PySide6.QtCore import QObject, Qt, Signal
+
+ACTIONS = {"next", "prev", "blank", "black", "reference"}
+QUEUE_SIZE = 8
+"""States waiting per websocket client, a slow client only misses intermediate ones"""
+MAX_HEADER = 16 * 1024
+MAX_BODY = 64 * 1024
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+PAGE = """<!doctype html><html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>Projector</title><style>body{font-family:sans-serif;background:#111;color:#eee;margin:1em}
+button{font-size:1.4em;margin:.2em;padding:.4em .8em}#text{white-space:pre-wrap;font-size:1.3em;margin:1em 0}
+#footer{color:#aaa}</style></head><body>
+<div><button onclick="send('prev')">&#9664;</button><button onclick="send('next')">&#9654;</button>
+<button onclick="send('blank')">Blank</button><button onclick="send('black')">Black</button></div>
+<form onsubmit="send('reference', this.q.value); return false"><input name="q" placeholder="Jn 3:16"><button>Go</button></form>
+<div id="text"></div><div id="footer"></div>
+<script>
+let ws;
+function connect(){ws=new WebSocket((location.protocol=="https:"?"wss://":"ws://")+location.host+"/ws");
+ws.onmessage=e=>{const s=JSON.parse(e.data);text.textContent=s.black?"(black)":(s.columns.length?s.columns.join("\\n\\n"):s.text);footer.textContent=s.footer};
+ws.onclose=()=>setTimeout(connect,1000)}
+function send(action,argument){ws.send(JSON.stringify({action:action,argument:argument||""}))}
+connect();
+</script></body></html>"""
+
+class RemoteServer(QObject):
+    """Runs the server loop on a daemon thread, commands are handed to on_command on the GUI thread"""
+    command = Signal(str, str)
+    """(action, argument), emitted on the server thread"""
+
+    def __init__(self, on_command: Callable[[str, str], None], host: str = "0.0.0.0", port: int = 8765, parent=None):
+        super().__init__(parent)
+        self.command.connect(on_command, Qt.ConnectionType.QueuedConnection)
+        self.host = host
+        self.port = port
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._started = threading.Event()
+        self._state = json.dumps({"text": "", "footer": "", "columns": [], "black": False})
+        self._clients: set[asyncio.Queue[str]] = set()
+
+    def start(self):
+        """Bind and serve in the background | port 0 picks a free port, read it back from .port"""
+        self._thread = threading.Thread(target=self._run, name="remote-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self):
+        loop, self.loop = self.loop, None
+        if loop is not None and self._thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=5)
+
+    def publish(self, state: dict):
+        """Push a new screen state to every viewer | safe to call from the GUI thread, never blocks"""
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._broadcast, json.dumps(state, ensure_ascii=False))
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            print(f"Remote control could not listen on {self.host}:{self.port}: {e}")
+            loop.close()
+            self._started.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self.loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            # Open websockets keep their handlers pending, cancel them so the loop closes cleanly
+            server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def _broadcast(self, message: str):
+        self._state = message
+        for outbox in self._clients:
+            if outbox.full():
+                outbox.get_nowait()
+            outbox.put_nowait(message)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if len(head) > MAX_HEADER:
+                return
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in header_lines if line)}
+            url = urlsplit(target)
+            if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, headers)
+                return
+            length = min(int(headers.get("content-length", "0") or 0), MAX_BODY)
+            body = await reader.readexactly(length) if length else b""
+            status, content_type, payload = self._route(method, url.path, url.query, body)
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+                         "Cache-Control: no-store\r\nConnection: close\r\n\r\n".encode() + payload)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Shutting down with viewers still connected
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, method: str, path: str, query: str, body: bytes) -> tuple[str, str, bytes]:
+        if method == "GET" and path == "/":
+            return "200 OK", "text/html; charset=utf-8", PAGE.encode()
+        if method == "GET" and path == "/api/state":
+            return "200 OK", "application/json", self._state.encode()
+        if method == "POST" and path.startswith("/api/"):
+            action = path.removeprefix("/api/")
+            if action not in ACTIONS:
+                return "404 Not Found", "application/json", b'{"error":"unknown action"}'
+            argument = parse_qs(query).get("q", [""])[0] or unquote(body.decode("utf-8", "replace")).strip()
+            self.command.emit(action, argument)
+            return "202 Accepted", "application/json", b'{"ok":true}'
+        return "404 Not Found", "application/json", b'{"error":"not found"}'
+
+    async def _websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict[str, str]):
+        key = headers.get("sec-websocket-key", "").encode()
+        accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        outbox: asyncio.Queue[str] = asyncio.Queue(QUEUE_SIZE)
+        outbox.put_nowait(self._state)
+        self._clients.add(outbox)
+        sender = asyncio.ensure_future(self._send_states(writer, outbox))
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == 0x8:
+                    writer.write(encode_frame(b"", 0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(encode_frame(payload, 0xA))
+                elif opcode == 0x1:
+                    self._websocket_command(payload)
+        finally:
+            self._clients.discard(outbox)
+            sender.cancel()
+
+    async def _send_states(self, writer: asyncio.StreamWriter, outbox: asyncio.Queue[str]):
+        try:
+            while True:
+                writer.write(encode_frame((await outbox.get()).encode()))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def _websocket_command(self, payload: bytes):
+        try:
+            message = json.loads(payload)
+            action, argument = message.get("action", ""), str(message.get("argument", ""))
+        except (ValueError, AttributeError):
+            return
+        if action in ACTIONS:
+            self.command.emit(action, argument)
+
+def encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Unmasked final frame, as sent by a server"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """Read a frame, unmasking client payloads | fragments are not expected from the control page"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if length > MAX_BODY:
+        raise ValueError("frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else b""
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
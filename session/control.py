@@ -0,0 +1,47 @@
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtGui import QAction
+from database import bible
+from playlist import panel
+from session.snapshot import Snapshot, SnapshotWriter
+from ui.displays import DisplayManager
+from ui.screen import ShowScreen
+
+writer: SnapshotWriter | None = None
+
+def capture(window: QWidget, second_window: ShowScreen, displays: DisplayManager) -> Snapshot:
+    reading = bible.reading
+    return Snapshot(
+        bible.current_bible, bible.current_book, bible.current_chapter, bible.current_verse,
+        [[slide.first, slide.last, slide.text, slide.footer] for slide in reading.slides] if reading is not None else [],
+        reading.position if reading is not None else -1,
+        second_window.state(), [item.to_row() for item in panel.items()], panel.queue.position,
+        dict(displays.roles), displays.hidden, window.saveGeometry().toBase64().data().decode("ascii"))
+
+def init(window: QWidget, second_window: ShowScreen, displays: DisplayManager, snapshot: Snapshot | None):
+    """Put the snapshot's slide back on the screen, then save a snapshot whenever the projection changes"""
+    global writer
+    action_black: QAction = window.findChild(QAction, "actionBlack") # type: ignore
+    action_hide: QAction = window.findChild(QAction, "actionHide") # type: ignore
+
+    if snapshot is not None:
+        screen = snapshot.screen
+        if screen.get("columns"):
+            second_window.setColumns(screen["columns"], screen.get("footer", ""))
+        elif screen.get("text"):
+            second_window.setText(screen["text"], screen.get("footer", ""))
+        if screen.get("black"):
+            action_black.setChecked(True)
+            second_window.triggerBlack()
+        displays.roles.update(snapshot.roles)
+        if snapshot.hidden:
+            action_hide.setChecked(True)
+
+    writer = SnapshotWriter()
+    # Capturing is cheap, serializing and writing happen on the writer thread
+    second_window.on_shown.append(lambda: writer.submit(capture(window, second_window, displays)) if writer is not None else None)
+
+    def stop():
+        if writer is not None:
+            writer.submit(capture(window, second_window, displays))
+            writer.stop()
+    QApplication.instance().aboutToQuit.connect(stop) # type: ignore
@@ -0,0 +1,25 @@
+"""Parts of the session put back before the main window is shown, the rest is restored by session.control"""
+from PySide6.QtCore import QByteArray
+from PySide6.QtWidgets import QWidget
+from database import bible
+from database.reading import Reading, Slide
+from session.snapshot import Snapshot
+from utils.file_manager import book_path
+
+def restore_navigation(snapshot: Snapshot | None):
+    """Before database.bible is wired: open the snapshot's module first at its verse, and read its chapter meanwhile"""
+    if snapshot is None or not snapshot.bible or not book_path(snapshot.bible).exists():
+        return
+    bible.startup_module = snapshot.bible
+    bible.current_book, bible.current_chapter, bible.current_verse = snapshot.book, snapshot.chapter, snapshot.verse
+    bible.resume_quietly = True
+    if snapshot.reading:
+        bible.reading = Reading([Slide(*row) for row in snapshot.reading])
+        bible.reading.go(snapshot.slide)
+    if snapshot.chapter > 0:
+        bible.prefetcher.request((snapshot.bible, snapshot.book, snapshot.chapter))
+
+def restore_geometry(window: QWidget, snapshot: Snapshot | None):
+    """Before the window is shown, so it opens where it was instead of jumping there"""
+    if snapshot is not None and snapshot.geometry:
+        window.restoreGeometry(QByteArray.fromBase64(snapshot.geometry.encode("ascii")))
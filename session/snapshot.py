@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from pathlib import Path
+from utils.file_manager import SESSION_PATH
+
+FORMAT_VERSION = 1
+
+class Snapshot:
+    """What is projected and where the operator is, enough to continue the service after a restart"""
+    def __init__(self, bible: str = "", book: int = -1, chapter: int = -1, verse: int = -1,
+                 reading: list[list] | None = None, slide: int = -1, screen: dict | None = None,
+                 playlist: list[list] | None = None, cue: int = -1, roles: dict[str, str] | None = None,
+                 hidden: bool = False, geometry: str = ""):
+        self.bible = bible
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        """Verse row, -1 when no verse is selected"""
+        self.reading = reading or []
+        """Slides of the projected verse range as [first, last, text, footer] rows"""
+        self.slide = slide
+        self.screen = screen or {}
+        """ShowScreen.state(): text, footer, columns, black"""
+        self.playlist = playlist or []
+        """Playlist item rows, see PlaylistItem.to_row"""
+        self.cue = cue
+        """Position in the started playlist, -1 when it was not started"""
+        self.roles = roles or {}
+        """Display roles by screen name"""
+        self.hidden = hidden
+        self.geometry = geometry
+        """Main window geometry, base64 of QWidget.saveGeometry"""
+
+    def to_json(self) -> dict:
+        return {"version": FORMAT_VERSION, **vars(self)}
+
+def load_snapshot(path: Path = SESSION_PATH) -> Snapshot | None:
+    """The last saved session, None when there is none or it cannot be used"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.pop("version", None) != FORMAT_VERSION:
+            return None
+        return Snapshot(**data)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"Could not restore the session: {e}")
+        return None
+
+class SnapshotWriter:
+    """Saves snapshots on a background thread | a burst of changes ends in a single write of the latest one"""
+    def __init__(self, path: Path = SESSION_PATH):
+        self.path = path
+        self._pending: dict | None = None
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot: Snapshot):
+        with self._condition:
+            self._pending = snapshot.to_json()
+            self._condition.notify()
+
+    def stop(self):
+        """Write the pending snapshot and end the thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        written: dict | None = None
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                data, self._pending = self._pending, None
+            if data is None:
+                return
+            if data != written:
+                self.write(data)
+                written = data
+
+    def write(self, data: dict):
+        """Replace the file atomically, a crash leaves either the old or the new snapshot"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save the session: {e}")
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, TextIO
+from PySide6.QtCore import QThread, Signal
+from songs.store import Slide, SongStore
+from utils.file_manager import SONGS_PATH
+from utils.text import fold
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+WRAPPER_KEY = "songs"
+"""Member holding the song array when an export wraps it in an object"""
+
+class ImportedSong:
+    def __init__(self, uuid: str, title: str, slides: list[Slide], author: str = ""):
+        self.uuid = uuid
+        self.title = title
+        self.slides = slides
+        self.author = author
+
+    @property
+    def hash(self) -> str:
+        content = [self.title, self.author, [(s.label, s.text) for s in self.slides]]
+        return hashlib.sha1(json.dumps(content, ensure_ascii=False).encode()).hexdigest()
+
+class ImportStats:
+    def __init__(self):
+        self.added = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def __str__(self) -> str:
+        return f"{self.added} added, {self.updated} updated, {self.unchanged} unchanged, {self.removed} removed"
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE, key: str = WRAPPER_KEY) -> Iterator[dict]:
+    """Yield the objects of a top-level json array, or of the array under key in a top-level object, one by one
+
+    Other members of a wrapper object are decoded and skipped, only the song array is streamed"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    state = "start"
+    """start -> (member -> colon -> value)* -> items"""
+    member = ""
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n" + ("," if state in ("member", "items") else ""):
+            pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            try:
+                if state == "start":
+                    if char not in "[{":
+                        raise ValueError("Expected a json array of songs or an object with a songs array")
+                    state = "items" if char == "[" else "member"
+                    pos += 1
+                    continue
+                if state == "member":
+                    if char == "}":
+                        return
+                    member, pos = decoder.raw_decode(buffer, pos)
+                    state = "colon"
+                    continue
+                if state == "colon":
+                    if char != ":":
+                        raise ValueError(f"Expected ':' after {member!r}")
+                    state = "value"
+                    pos += 1
+                    continue
+                if state == "value" and member == key:
+                    if char != "[":
+                        raise ValueError(f"{key!r} is not an array")
+                    state = "items"
+                    pos += 1
+                    continue
+                if state == "items" and char == "]":
+                    return
+                value, end = decoder.raw_decode(buffer, pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    pos = end
+                    if state == "items":
+                        yield value
+                    else:
+                        state = "member"
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        if eof:
+            if state != "start":
+                # A cut-off export must not look complete, it could remove the songs that are missing from it
+                raise ValueError("The song file ends before its song array does")
+            return
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        # Drop what was already decoded so memory stays bounded by the largest song
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+_LABELS = {0: "", 1: "R", 2: "B", 3: "C", 4: "E"}
+"""Projector section types -> slide label prefix (verse, chorus, bridge, coda, ending)"""
+
+def song_from_json(item: dict) -> ImportedSong | None:
+    title = (item.get("title") or "").strip()
+    verses = item.get("songVerseDTOS") or item.get("songVerses") or item.get("verses") or []
+    slides: list[Slide] = []
+    verse_number = 0
+    for verse in verses:
+        text = (verse.get("text") if isinstance(verse, dict) else str(verse)) or ""
+        text = text.strip()
+        if not text:
+            continue
+        chorus = isinstance(verse, dict) and (verse.get("chorus") or verse.get("isChorus"))
+        section = verse.get("type", verse.get("sectionType", 0)) if isinstance(verse, dict) else 0
+        label = "R" if chorus else _LABELS.get(section, "") if isinstance(section, int) else ""
+        if not label:
+            verse_number += 1
+            label = str(verse_number)
+        slides.append(Slide(label, text))
+    if not title or not slides:
+        return None
+    uuid = item.get("uuid") or f"title:{fold(title)}"
+    return ImportedSong(uuid, title, slides, (item.get("author") or "").strip())
+
+def _local(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+def _element_text(element: ET.Element) -> str:
+    """Inner text with <br/> as line breaks"""
+    parts = [element.text or ""]
+    for child in element:
+        if _local(child.tag) == "br":
+            parts.append("\n")
+        parts.append(_element_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+def iter_xml_songs(path: Path) -> Iterator[ImportedSong]:
+    """Songs of an xml export, <song> elements with <title>, <author> and <verse> children (OpenLyrics works too)"""
+    for _, element in ET.iterparse(path, events=("end",)):
+        if _local(element.tag) != "song":
+            continue
+        title, author = "", ""
+        slides: list[Slide] = []
+        for child in element.iter():
+            name = _local(child.tag)
+            if name == "title" and not title:
+                title = _element_text(child).strip()
+            elif name == "author" and not author:
+                author = _element_text(child).strip()
+            elif name == "verse":
+                text = "\n".join(line.strip() for line in _element_text(child).strip().splitlines())
+                if text:
+                    slides.append(Slide(child.get("name") or child.get("label") or str(len(slides)+1), text))
+        uuid = element.get("uuid") or element.get("id") or f"title:{fold(title)}"
+        element.clear()
+        if title and slides:
+            yield ImportedSong(uuid, title, slides, author)
+
+def iter_songs(path: Path) -> Iterator[ImportedSong]:
+    if path.suffix.lower() == ".xml":
+        yield from iter_xml_songs(path)
+        return
+    with open(path, encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            song = song_from_json(item) if isinstance(item, dict) else None
+            if song is not None:
+                yield song
+
+def import_songs(store: SongStore, path: Path, remove_missing: bool = False, on_progress=lambda count: None) -> ImportStats:
+    """Sync the store with an export file, rewriting only songs whose content hash changed"""
+    stats = ImportStats()
+    conn = store.connection
+    known: dict[str, str] = dict(conn.execute("SELECT uuid, hash FROM songs").fetchall())
+    seen: set[str] = set()
+    songs = iter_songs(Path(path))
+    # One transaction per batch keeps a huge export from holding a single giant journal
+    while batch := list(islice(songs, BATCH_SIZE)):
+        with conn:
+            for song in batch:
+                seen.add(song.uuid)
+                digest = song.hash
+                if known.get(song.uuid) == digest:
+                    stats.unchanged += 1
+                    continue
+                if song.uuid in known:
+                    stats.updated += 1
+                else:
+                    stats.added += 1
+                store._write_song(song.uuid, song.title, song.slides, song.author, digest)
+                known[song.uuid] = digest
+        on_progress(stats.added + stats.updated + stats.unchanged)
+    if remove_missing:
+        missing = set(known) - seen
+        with conn:
+            for (song_id,) in conn.execute(f"SELECT id FROM songs WHERE uuid IN ({','.join('?' * len(missing))})", tuple(missing)).fetchall():
+                store._delete_song(song_id)
+                stats.removed += 1
+    return stats
+
+class SongImportWorker(QThread):
+    progress = Signal(int)
+    finished = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, path: Path, store_path: Path = SONGS_PATH, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.store_path = store_path
+
+    def run(self):
+        try:
+            store = SongStore(self.store_path)
+            try:
+                stats = import_songs(store, self.path, on_progress=self.progress.emit)
+            finally:
+                store.close()
+            self.finished.emit(str(stats))
+        except Exception as e:
+            self.failed.emit(str(e))
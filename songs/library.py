@@ -0,0 +1,100 @@
+from pathlib import Path
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QWidget, QListView, QListWidget, QLineEdit, QLabel, QPushButton, QInputDialog, QFileDialog, QMessageBox
+from songs.store import Song, SongStore, split_slides
+from ui.models import ID_ROLE, SongListModel
+from ui.screen import ShowScreen
+
+store: SongStore | None = None
+current_song: Song | None = None
+"""Selected song, its slides are loaded on first use"""
+import_worker = None
+"""Running SongImportWorker, kept referenced until it finishes"""
+
+def init(window: QWidget, second_window: ShowScreen):
+    song_list_view: QListView = window.findChild(QListView, "listSongs") # type: ignore
+    label_list_widget: QListWidget = window.findChild(QListWidget, "listVerses") # type: ignore
+    slide_list_widget: QListWidget = window.findChild(QListWidget, "listVerseSelector") # type: ignore
+    search_edit: QLineEdit = window.findChild(QLineEdit, "lineSearchSong") # type: ignore
+    author_label: QLabel = window.findChild(QLabel, "labelAuthor") # type: ignore
+    btn_add: QPushButton = window.findChild(QPushButton, "btnAddSong") # type: ignore
+    btn_import: QPushButton = window.findChild(QPushButton, "btnDownloadSong") # type: ignore
+
+    song_model = SongListModel(window)
+    song_list_view.setModel(song_model)
+    label_list_widget.setFlow(QListView.Flow.LeftToRight)
+    slide_list_widget.setWordWrap(True)
+
+    search_edit.textChanged.connect(lambda text: song_model.set_songs(store.search(text)) if store is not None else None)
+    song_list_view.selectionModel().currentRowChanged.connect(lambda index, _: selected_song_changed(index.data(ID_ROLE)))
+    label_list_widget.currentRowChanged.connect(lambda index: slide_list_widget.setCurrentRow(index))
+    slide_list_widget.currentRowChanged.connect(lambda index: selected_slide_changed(index))
+    slide_list_widget.clicked.connect(lambda index: selected_slide_changed(index.row()))
+    btn_add.clicked.connect(lambda: add_song())
+    btn_import.clicked.connect(lambda: import_songs())
+    # Opened on the first event loop turn so the window is painted before any database work
+    QTimer.singleShot(0, lambda: open_store())
+
+    def open_store():
+        global store
+        store = SongStore()
+        song_model.set_songs(store.search(search_edit.text()))
+
+    def selected_song_changed(song_id: int | None):
+        global current_song
+        if song_id is None or store is None:
+            return
+        current_song = store.get_song(song_id)
+        if current_song is None:
+            return
+        author_label.setText(current_song.author)
+        label_list_widget.clear()
+        slide_list_widget.clear()
+        label_list_widget.addItems([slide.label for slide in current_song.slides])
+        slide_list_widget.addItems([slide.text for slide in current_song.slides])
+
+    def selected_slide_changed(index: int):
+        if current_song is None or not (0 <= index < len(current_song.slides)):
+            return
+        label_list_widget.blockSignals(True)
+        label_list_widget.setCurrentRow(index)
+        label_list_widget.blockSignals(False)
+        second_window.setText(current_song.slides[index].text, current_song.title)
+        if index + 1 < len(current_song.slides):
+            second_window.prerender([current_song.slides[index + 1].text], current_song.title)
+
+    def add_song():
+        if store is None:
+            return
+        title, ok = QInputDialog.getText(window, "New song", "Title")
+        if not ok or not title.strip():
+            return
+        lyrics, ok = QInputDialog.getMultiLineText(window, "New song", "Lyrics (separate verses with an empty line)")
+        if not ok:
+            return
+        store.add_song(title.strip(), split_slides(lyrics))
+        song_model.set_songs(store.search(search_edit.text()))
+
+    def import_songs():
+        global import_worker
+        path, _ = QFileDialog.getOpenFileName(window, "Import songs", "", "Song exports (*.json *.xml)")
+        if not path:
+            return
+        from songs.importer import SongImportWorker
+        # The worker writes through its own connection, the list is refreshed when it is done
+        worker = import_worker = SongImportWorker(Path(path))
+        btn_import.setEnabled(False)
+        worker.progress.connect(lambda count: btn_import.setText(f"Import ({count})"))
+        worker.finished.connect(lambda stats: on_import_done(worker, f"Import finished: {stats}"))
+        worker.failed.connect(lambda msg: on_import_done(worker, f"Import failed: {msg}"))
+        worker.start()
+
+    def on_import_done(worker, message: str):
+        global import_worker
+        import_worker = None
+        btn_import.setText("Import")
+        btn_import.setEnabled(True)
+        worker.deleteLater()
+        if store is not None:
+            song_model.set_songs(store.search(search_edit.text()))
+        QMessageBox.information(window, "Import songs", message)
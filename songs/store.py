@@ -0,0 +1,159 @@
+import re
+import sqlite3
+import uuid as uuid_lib
+from pathlib import Path
+from utils.file_manager import SONGS_PATH
+from utils.text import fold, fold_key, tokens
+
+class SongInfo:
+    """Song row without its slides"""
+    def __init__(self, id: int, title: str, first_line: str, author: str):
+        self.id = id
+        self.title = title
+        self.first_line = first_line
+        self.author = author
+
+    def get_full_name(self) -> str:
+        return self.title
+
+class Slide:
+    def __init__(self, label: str, text: str):
+        self.label = label
+        """Verse label eg. "1", "R" for refrain"""
+        self.text = text
+
+class Song(SongInfo):
+    """Song whose slides are read from the store on first access"""
+    def __init__(self, store: "SongStore", id: int, title: str, first_line: str, author: str):
+        super().__init__(id, title, first_line, author)
+        self._store = store
+        self._slides: list[Slide] | None = None
+
+    @property
+    def slides(self) -> list[Slide]:
+        if self._slides is None:
+            self._slides = self._store.get_slides(self.id)
+        return self._slides
+
+def split_slides(text: str) -> list[Slide]:
+    """Slides from lyrics where verses are separated by empty lines"""
+    verses = [v.strip() for v in re.split(r"\n\s*\n", text.strip()) if v.strip()]
+    return [Slide(str(i), verse) for i, verse in enumerate(verses, start=1)]
+
+def first_line_of(slides: list[Slide]) -> str:
+    for slide in slides:
+        for line in slide.text.splitlines():
+            if line.strip():
+                return line.strip()
+    return ""
+
+class SongStore:
+    """Songs split into slides with full-text, title and first-line indexes"""
+    def __init__(self, path: Path = SONGS_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS songs (
+                id INTEGER PRIMARY KEY, uuid TEXT UNIQUE, title TEXT, title_key TEXT,
+                first_line TEXT, first_line_key TEXT, author TEXT, hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS songs_title ON songs(title_key);
+            CREATE INDEX IF NOT EXISTS songs_first_line ON songs(first_line_key);
+            CREATE TABLE IF NOT EXISTS slides (
+                song_id INTEGER, position INTEGER, label TEXT, text TEXT,
+                PRIMARY KEY (song_id, position)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+                title, lyrics, tokenize = 'unicode61 remove_diacritics 2'
+            );
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def add_song(self, title: str, slides: list[Slide], author: str = "", uuid: str | None = None, hash: str = "") -> int:
+        """Insert or replace a song by uuid | returns its id"""
+        uuid = uuid or str(uuid_lib.uuid4())
+        with self.connection:
+            return self._write_song(uuid, title, slides, author, hash)
+
+    def _write_song(self, uuid: str, title: str, slides: list[Slide], author: str, hash: str) -> int:
+        """Write without committing, for batching many songs into one transaction"""
+        conn = self.connection
+        first_line = first_line_of(slides)
+        row = conn.execute("SELECT id FROM songs WHERE uuid = ?", (uuid,)).fetchone()
+        values = (title, fold(title), first_line, fold(first_line), author, hash)
+        if row is None:
+            song_id = conn.execute("""
+                INSERT INTO songs (uuid, title, title_key, first_line, first_line_key, author, hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""", (uuid, *values)).lastrowid
+        else:
+            song_id = row[0]
+            conn.execute("""
+                UPDATE songs SET title = ?, title_key = ?, first_line = ?, first_line_key = ?, author = ?, hash = ?
+                WHERE id = ?""", (*values, song_id))
+            conn.execute("DELETE FROM slides WHERE song_id = ?", (song_id,))
+            conn.execute("DELETE FROM songs_fts WHERE rowid = ?", (song_id,))
+        conn.executemany("INSERT INTO slides VALUES (?, ?, ?, ?)",
+                         [(song_id, i, slide.label, slide.text) for i, slide in enumerate(slides)])
+        conn.execute("INSERT INTO songs_fts (rowid, title, lyrics) VALUES (?, ?, ?)",
+                     (song_id, title, "\n".join(slide.text for slide in slides)))
+        return song_id
+
+    def delete_song(self, song_id: int):
+        with self.connection:
+            self._delete_song(song_id)
+
+    def _delete_song(self, song_id: int):
+        self.connection.execute("DELETE FROM songs WHERE id = ?", (song_id,))
+        self.connection.execute("DELETE FROM slides WHERE song_id = ?", (song_id,))
+        self.connection.execute("DELETE FROM songs_fts WHERE rowid = ?", (song_id,))
+
+    def get_song(self, song_id: int) -> Song | None:
+        row = self.connection.execute("SELECT id, title, first_line, author FROM songs WHERE id = ?", (song_id,)).fetchone()
+        return Song(self, *row) if row else None
+
+    def get_slides(self, song_id: int) -> list[Slide]:
+        rows = self.connection.execute("SELECT label, text FROM slides WHERE song_id = ? ORDER BY position", (song_id,))
+        return [Slide(label, text) for label, text in rows]
+
+    def get_uuid(self, song_id: int) -> str | None:
+        row = self.connection.execute("SELECT uuid FROM songs WHERE id = ?", (song_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_songs_by_uuid(self, uuids: list[str]) -> dict[str, tuple[str, list[Slide]]]:
+        """Title and slides of many songs in one query | unknown uuids are left out"""
+        if not uuids:
+            return {}
+        songs: dict[str, tuple[str, list[Slide]]] = {}
+        rows = self.connection.execute(f"""
+            SELECT s.uuid, s.title, sl.label, sl.text FROM songs s JOIN slides sl ON sl.song_id = s.id
+            WHERE s.uuid IN ({",".join("?" * len(uuids))}) ORDER BY s.id, sl.position""", uuids)
+        for uuid, title, label, text in rows:
+            songs.setdefault(uuid, (title, []))[1].append(Slide(label, text))
+        return songs
+
+    def search(self, text: str, limit: int = 200) -> list[SongInfo]:
+        """Title and first-line prefix matches first, then ranked full-text matches | empty text lists every song"""
+        key = fold_key(text.strip())
+        if not key:
+            rows = self.connection.execute("SELECT id, title, first_line, author FROM songs ORDER BY title_key LIMIT ?", (limit,))
+            return [SongInfo(*row) for row in rows]
+        # key + "\uffff" bounds the prefix range so the indexes are used
+        rows = self.connection.execute("""
+            SELECT id, title, first_line, author FROM songs WHERE title_key >= ? AND title_key < ?
+            UNION
+            SELECT id, title, first_line, author FROM songs WHERE first_line_key >= ? AND first_line_key < ?
+            ORDER BY 2 LIMIT ?""", (key, key + "\uffff", key, key + "\uffff", limit)).fetchall()
+        found = {row[0] for row in rows}
+        words = list(tokens(text))
+        if words and len(rows) < limit:
+            query = " ".join(f'"{w}"' for w in words) + "*"
+            ranked = self.connection.execute("""
+                SELECT s.id, s.title, s.first_line, s.author FROM songs_fts f JOIN songs s ON s.id = f.rowid
+                WHERE songs_fts MATCH ? ORDER BY f.rank LIMIT ?""", (query, limit)).fetchall()
+            rows += [row for row in ranked if row[0] not in found][:limit - len(rows)]
+        return [SongInfo(*row) for row in rows]
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
@@ -0,0 +1,27 @@
+import sqlite3
+import pytest
+from database import corpus
+from database.corpus import load_corpus
+
+ALL_VERSES = "SELECT book_number, chapter, verse, text FROM verses ORDER BY book_number, chapter, verse"
+
+@pytest.fixture
+def module(monkeypatch):
+    """A module's verses table, its columns are NUMERIC like in MyBible files"""
+    monkeypatch.setattr(corpus, "module_plans", lambda name: {"all_verses": ALL_VERSES})
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE verses (book_number NUMERIC, chapter NUMERIC, verse NUMERIC, text TEXT)")
+    yield conn
+    conn.close()
+
+def test_real_numbers(module):
+    module.executemany("INSERT INTO verses VALUES (?, ?, ?, ?)",
+                       [(10.0, 1.0, 1.0, "<pb/>Kezdetben"), (10.0, 1.0, 2.0, "A föld"), (10.0, 2.0, 1.0, "Így")])
+    loaded = load_corpus("TEST", module.cursor(), sidecar=False)
+    assert list(loaded.chapter(10, 1)) == [(1, "Kezdetben"), (2, "A föld")]
+    assert list(loaded.chapter(10, 2)) == [(1, "Így")]
+
+def test_verse_number_out_of_range(module):
+    module.execute("INSERT INTO verses VALUES (10, 1, 70000, 'x')")
+    with pytest.raises(ValueError):
+        load_corpus("TEST", module.cursor(), sidecar=False)
@@ -0,0 +1,112 @@
+import io
+import re
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.downloader import DownloadEngine, DownloadJob, extract, fetch
+
+MODULE = "KB.SQLite3"
+CONTENT = bytes(range(256)) * 400
+
+def make_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(MODULE, CONTENT)
+    return buffer.getvalue()
+
+ARCHIVE = make_zip()
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves ARCHIVE with Range support like the module mirror does"""
+    ranges: list[str | None] = []
+    cut_after: int | None = None
+    """Close the connection after this many bytes of a full response"""
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        RangeHandler.ranges.append(requested)
+        start = 0
+        if requested:
+            start = int(re.fullmatch(r"bytes=(\d+)-", requested).group(1)) # type: ignore
+            if start >= len(ARCHIVE):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(ARCHIVE)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(ARCHIVE)-1}/{len(ARCHIVE)}")
+        else:
+            self.send_response(200)
+        body = ARCHIVE[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.cut_after is not None and not requested:
+            self.wfile.write(body[:self.cut_after])
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def url():
+    RangeHandler.ranges = []
+    RangeHandler.cut_after = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/KB.zip"
+    server.shutdown()
+    server.server_close()
+
+def job(url: str, tmp_path) -> DownloadJob:
+    return DownloadJob("KB", url, MODULE, tmp_path)
+
+def test_full_download_and_extract(url, tmp_path):
+    done = []
+    progress: list[tuple[int, int]] = []
+    errors = DownloadEngine(chunk_size=4096).run([DownloadJob("KB", url, MODULE, tmp_path, lambda: done.append(True))],
+                                                 lambda received, total: progress.append((received, total)))
+    assert errors == {}
+    assert (tmp_path / MODULE).read_bytes() == CONTENT
+    assert not (tmp_path / "KB.zip.part").exists()
+    assert done == [True]
+    assert progress[-1] == (len(ARCHIVE), len(ARCHIVE))
+    assert RangeHandler.ranges == [None]
+
+def test_resume_partial_file(url, tmp_path):
+    download = job(url, tmp_path)
+    download.part_path.write_bytes(ARCHIVE[:1000])
+    fetch(download)
+    assert RangeHandler.ranges == ["bytes=1000-"]
+    assert download.part_path.read_bytes() == ARCHIVE
+    assert (download.received, download.total) == (len(ARCHIVE), len(ARCHIVE))
+
+def test_complete_partial_file_is_not_downloaded_again(url, tmp_path):
+    download = job(url, tmp_path)
+    download.part_path.write_bytes(ARCHIVE)
+    fetch(download)
+    assert RangeHandler.ranges == [f"bytes={len(ARCHIVE)}-"]
+    assert (download.received, download.total) == (len(ARCHIVE), len(ARCHIVE))
+    extract(download)
+    assert (tmp_path / MODULE).read_bytes() == CONTENT
+
+def test_cut_connection_keeps_the_partial_file_for_the_next_try(url, tmp_path):
+    RangeHandler.cut_after = 5000
+    download = job(url, tmp_path)
+    with pytest.raises(IOError):
+        fetch(download)
+    assert download.part_path.stat().st_size == 5000
+    RangeHandler.cut_after = None
+    fetch(download)
+    assert RangeHandler.ranges == [None, "bytes=5000-"]
+    assert download.part_path.read_bytes() == ARCHIVE
+
+def test_bad_archive_is_dropped(tmp_path):
+    download = job("http://127.0.0.1/unused", tmp_path)
+    download.part_path.write_bytes(b"not a zip")
+    with pytest.raises(zipfile.BadZipFile):
+        extract(download)
+    assert not download.part_path.exists()
+    assert not (tmp_path / MODULE).exists()
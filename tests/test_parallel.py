@@ -0,0 +1,62 @@
+from database.parallel import Alignment
+
+JOEL, MALACHI, PSALMS, JOHN = 360, 460, 230, 500
+
+def layout(hebrew: bool) -> dict[int, list[int]]:
+    """Verse counts of a few books, Hebrew based (titles numbered, Joel 4 and Malachi 3 chapters) or English"""
+    psalms = [20] * 150
+    psalms[3-1] = 9 if hebrew else 8
+    psalms[51-1] = 21 if hebrew else 19
+    psalms[1-1] = 7 if hebrew else 6
+    return {
+        JOEL: [20, 27, 5, 21] if hebrew else [20, 32, 21],
+        MALACHI: [14, 17, 24] if hebrew else [14, 17, 18, 6],
+        PSALMS: psalms,
+        JOHN: [51, 25, 36],
+    }
+
+ENGLISH, HEBREW = layout(False), layout(True)
+
+def test_same_layout_is_the_identity():
+    alignment = Alignment(ENGLISH, ENGLISH)
+    assert alignment.map((JOEL, 2, 28)) == (JOEL, 2, 28)
+    assert alignment.map((PSALMS, 3, 1)) == (PSALMS, 3, 1)
+
+def test_joel():
+    alignment = Alignment(ENGLISH, HEBREW)
+    assert alignment.map((JOEL, 2, 27)) == (JOEL, 2, 27)
+    assert alignment.map((JOEL, 2, 28)) == (JOEL, 3, 1)
+    assert alignment.map((JOEL, 2, 32)) == (JOEL, 3, 5)
+    assert alignment.map((JOEL, 3, 1)) == (JOEL, 4, 1)
+    assert Alignment(HEBREW, ENGLISH).map((JOEL, 4, 21)) == (JOEL, 3, 21)
+
+def test_malachi():
+    alignment = Alignment(ENGLISH, HEBREW)
+    assert alignment.map((MALACHI, 3, 18)) == (MALACHI, 3, 18)
+    assert alignment.map((MALACHI, 4, 1)) == (MALACHI, 3, 19)
+    assert alignment.map((MALACHI, 4, 6)) == (MALACHI, 3, 24)
+    assert Alignment(HEBREW, ENGLISH).map((MALACHI, 3, 24)) == (MALACHI, 4, 6)
+
+def test_psalm_with_title():
+    alignment = Alignment(ENGLISH, HEBREW)
+    assert alignment.map((PSALMS, 3, 1)) == (PSALMS, 3, 2)
+    assert alignment.map((PSALMS, 3, 8)) == (PSALMS, 3, 9)
+    assert alignment.map((PSALMS, 51, 1)) == (PSALMS, 51, 3)
+
+def test_numbered_title_has_no_counterpart():
+    alignment = Alignment(HEBREW, ENGLISH)
+    assert alignment.map((PSALMS, 3, 1)) is None
+    assert alignment.map((PSALMS, 3, 2)) == (PSALMS, 3, 1)
+    assert alignment.map((PSALMS, 51, 2)) is None
+    assert alignment.map((PSALMS, 51, 3)) == (PSALMS, 51, 1)
+
+def test_psalm_without_title_is_not_shifted():
+    """Psalm 1 has no title, a different verse count comes from a split verse"""
+    alignment = Alignment(ENGLISH, HEBREW)
+    assert alignment.map((PSALMS, 1, 1)) == (PSALMS, 1, 1)
+    assert alignment.map((PSALMS, 1, 6)) == (PSALMS, 1, 6)
+
+def test_missing_book():
+    source = {**ENGLISH, 670: [25]}
+    assert Alignment(source, {**HEBREW, 680: [25]}).map((670, 1, 1)) == (680, 1, 1)
+    assert Alignment(source, HEBREW).map((670, 1, 1)) is None
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+import pytest
+from PySide6.QtCore import QCoreApplication
+from remote.server import QUEUE_SIZE, RemoteServer, read_frame
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+@pytest.fixture
+def commands() -> list[tuple[str, str]]:
+    return []
+
+@pytest.fixture
+def server(app, commands):
+    remote = RemoteServer(lambda action, argument: commands.append((action, argument)), host="127.0.0.1", port=0)
+    remote.start()
+    yield remote
+    remote.stop()
+
+def wait_for_commands(app, commands: list, count: int, timeout: float = 2):
+    """Commands arrive through a queued signal, they need the Qt event loop"""
+    deadline = time.monotonic() + timeout
+    while len(commands) < count and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return commands
+
+async def http(port: int, method: str, target: str, body: bytes = b"") -> tuple[str, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return head.split(b"\r\n")[0].decode(), payload
+
+async def open_websocket(port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(f"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 101")
+    return reader, writer
+
+def client_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Masked final frame, as sent by a browser"""
+    mask = os.urandom(4)
+    return struct.pack("!BB", 0x80 | opcode, 0x80 | len(payload)) + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+async def next_state(reader: asyncio.StreamReader) -> dict:
+    opcode, payload = await asyncio.wait_for(read_frame(reader), 2)
+    assert opcode == 0x1
+    return json.loads(payload)
+
+def test_get_state(server):
+    # Queued on the server loop before the request is accepted
+    server.publish({"text": "Jn 3:16", "footer": "Jn 3:16", "columns": [], "black": False})
+    status, payload = asyncio.run(http(server.port, "GET", "/api/state"))
+    assert status == "HTTP/1.1 200 OK"
+    assert json.loads(payload)["text"] == "Jn 3:16"
+
+def test_post_reference(app, server, commands):
+    status, _ = asyncio.run(http(server.port, "POST", "/api/reference", "Zsolt 23:1".encode()))
+    assert status == "HTTP/1.1 202 Accepted"
+    status, _ = asyncio.run(http(server.port, "POST", "/api/next"))
+    assert status == "HTTP/1.1 202 Accepted"
+    assert wait_for_commands(app, commands, 2) == [("reference", "Zsolt 23:1"), ("next", "")]
+
+def test_unknown_action(app, server, commands):
+    status, _ = asyncio.run(http(server.port, "POST", "/api/shutdown"))
+    assert status == "HTTP/1.1 404 Not Found"
+    assert wait_for_commands(app, commands, 1, timeout=0.2) == []
+
+def test_websocket_push_and_command(app, server, commands):
+    async def session():
+        reader, writer = await open_websocket(server.port)
+        first = await next_state(reader)
+        server.publish({"text": "Jel 22:21", "footer": "", "columns": [], "black": False})
+        pushed = await next_state(reader)
+        writer.write(client_frame(json.dumps({"action": "black", "argument": ""}).encode()))
+        writer.write(client_frame(b"", 0x8))
+        await writer.drain()
+        writer.close()
+        return first, pushed
+
+    first, pushed = asyncio.run(session())
+    assert first["text"] == ""
+    assert pushed["text"] == "Jel 22:21"
+    assert wait_for_commands(app, commands, 1) == [("black", "")]
+
+def test_slow_client_keeps_only_the_latest_states(server):
+    """A client that never reads holds at most QUEUE_SIZE states, the oldest are dropped"""
+    async def make_outbox() -> asyncio.Queue[str]:
+        outbox: asyncio.Queue[str] = asyncio.Queue(QUEUE_SIZE)
+        server._clients.add(outbox)
+        return outbox
+
+    async def drain(outbox: asyncio.Queue[str]) -> list[str]:
+        return [outbox.get_nowait() for _ in range(outbox.qsize())]
+
+    loop = server.loop
+    outbox = asyncio.run_coroutine_threadsafe(make_outbox(), loop).result()
+    for i in range(3 * QUEUE_SIZE):
+        server.publish({"text": str(i), "footer": "", "columns": [], "black": False})
+    states = asyncio.run_coroutine_threadsafe(drain(outbox), loop).result()
+    assert [json.loads(state)["text"] for state in states] == [str(i) for i in range(2 * QUEUE_SIZE, 3 * QUEUE_SIZE)]
@@ -0,0 +1,32 @@
+import sqlite3
+import pytest
+from database.search import TOKENIZER, to_match_query
+
+VERSES = ["Az Úr az én pásztorom", "Őrizd meg a lelkemet", "Könyörülj rajtam, Istenem", "Ügyelj az erősségre"]
+
+@pytest.fixture
+def index():
+    """A verse index tokenized like build_index does it"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE VIRTUAL TABLE verse_index USING fts5(text, tokenize = '{TOKENIZER}')")
+    conn.executemany("INSERT INTO verse_index VALUES (?)", [(verse,) for verse in VERSES])
+    yield conn
+    conn.close()
+
+def search(index: sqlite3.Connection, text: str) -> list[str]:
+    return [text for (text,) in index.execute("SELECT text FROM verse_index WHERE verse_index MATCH ? ORDER BY rank", (to_match_query(text),))]
+
+@pytest.mark.parametrize("typed, verse", [
+    ("pásztorom", VERSES[0]), ("PASZTOR", VERSES[0]), ("orizd", VERSES[1]), ("Őrizd lelk", VERSES[1]),
+    ("konyorulj", VERSES[2]), ("istenem", VERSES[2]), ("ugyelj erossegre", VERSES[3]),
+])
+def test_query_words_match_the_indexed_words(index, typed, verse):
+    assert search(index, typed) == [verse]
+
+def test_short_last_word_is_matched_whole(index):
+    assert search(index, "az ú") == []
+    assert search(index, "az úr") == [VERSES[0]]
+
+def test_too_short_query():
+    assert to_match_query("a") == ""
+    assert to_match_query(" ,. ") == ""
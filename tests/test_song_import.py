@@ -0,0 +1,26 @@
+import io
+import json
+import pytest
+from songs.importer import iter_json_array
+
+SONGS = [{"title": "Áldd, lelkem"}, {"title": "Dicsőség néki", "tags": ["[x]"]}]
+
+def items(text: str, chunk_size: int = 7) -> list:
+    return list(iter_json_array(io.StringIO(text), chunk_size))
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_top_level_array(chunk_size):
+    assert items(json.dumps(SONGS, ensure_ascii=False), chunk_size) == SONGS
+
+def test_bracket_in_a_string_before_the_songs():
+    assert items(json.dumps({"title": "[export]", "songs": SONGS})) == SONGS
+
+def test_other_array_before_the_songs():
+    assert items(json.dumps({"tags": ["a"], "count": 12, "songs": SONGS, "after": [1]})) == SONGS
+
+def test_wrapper_without_songs():
+    assert items(json.dumps({"tags": ["a"]})) == []
+
+def test_cut_off_file_is_an_error():
+    with pytest.raises(ValueError):
+        items(json.dumps({"songs": SONGS})[:-10])
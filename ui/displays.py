@@ -0,0 +1,129 @@
+from PySide6.QtWidgets import QApplication, QMenu, QWidget
+from PySide6.QtGui import QAction, QActionGroup, QCursor, QScreen
+from PySide6.QtCore import QObject, QRect, QTimer
+from ui.render import frame_cache
+from ui.screen import MirrorScreen, OutputScreen, ShowScreen, StageScreen
+
+ROLES = {"program": "Program", "stage": "Stage", "off": "Off"}
+DEFAULT_ROLE = "stage"
+"""Role of a screen beyond the first one until it is changed"""
+FRAMES_PER_OUTPUT = 8
+
+class DisplayManager(QObject):
+    """Puts the projected output on the first screen that is not the main window's and a role on every other one
+
+    Outputs read the shared ShowScreen state, rendered frames are shared through the frame cache"""
+    def __init__(self, window: QWidget, program: ShowScreen):
+        super().__init__(window)
+        self.window = window
+        self.program = program
+        self.outputs: dict[str, MirrorScreen | StageScreen] = {}
+        """Extra outputs by screen name"""
+        self.roles: dict[str, str] = {}
+        """Chosen roles by screen name, kept while a screen is unplugged"""
+        self.hidden = False
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        # A projected verse is followed by its pre-render, the outputs redraw once for both
+        self._refresh_timer.timeout.connect(self.refresh)
+        program.on_shown.append(self._refresh_timer.start)
+
+        app: QApplication = QApplication.instance() # type: ignore
+        for screen in app.screens():
+            self.watch(screen)
+        app.screenAdded.connect(self.screen_added)
+        app.screenRemoved.connect(lambda _: self.arrange())
+
+    def watch(self, screen: QScreen):
+        screen.geometryChanged.connect(lambda _: self.arrange())
+
+    def screen_added(self, screen: QScreen):
+        # A screen plugged in again is a new QScreen, so it is watched like any new one
+        self.watch(screen)
+        self.arrange()
+
+    def screens(self) -> list[QScreen]:
+        """Screens free for outputs, empty when the main window's screen is the only one"""
+        return [screen for screen in QApplication.screens() if screen is not self.window.screen()]
+
+    def role(self, screen: QScreen) -> str:
+        return self.roles.get(screen.name(), DEFAULT_ROLE)
+
+    def set_role(self, name: str, role: str):
+        self.roles[name] = role
+        self.arrange()
+
+    def arrange(self):
+        """Place every output on its screen, called again whenever a screen comes or goes"""
+        screens = self.screens()
+        if not screens:
+            place(self.program, QRect(50, 50, 800, 400), framed=True)
+        else:
+            place(self.program, screens[0].geometry(), framed=False)
+        self.program.setVisible(not self.hidden)
+
+        wanted = {screen.name(): (screen, self.role(screen)) for screen in screens[1:] if self.role(screen) != "off"}
+        for name in list(self.outputs):
+            output = self.outputs[name]
+            if name not in wanted or role_of(output) != wanted[name][1]:
+                output.close()
+                output.deleteLater()
+                del self.outputs[name]
+        for name, (screen, role) in wanted.items():
+            output = self.outputs.get(name)
+            if output is None:
+                output = StageScreen(self.program) if role == "stage" else MirrorScreen(self.program)
+                output.setWindowTitle(f"{ROLES[role]} - {name}")
+                self.outputs[name] = output
+            place(output, screen.geometry(), framed=False)
+            output.setVisible(not self.hidden)
+        frame_cache.max_size = FRAMES_PER_OUTPUT * (1 + len(self.outputs))
+        self.refresh()
+
+    def refresh(self):
+        for output in self.outputs.values():
+            output.refresh()
+
+    def set_hidden(self, hidden: bool):
+        """Follows the Hide action, which hides the program window itself"""
+        self.hidden = hidden
+        for output in self.outputs.values():
+            output.setVisible(not hidden)
+
+    def menu(self) -> QMenu:
+        """Role of every screen beyond the first, the first always shows the program"""
+        menu = QMenu(self.window)
+        screens = self.screens()
+        if len(screens) < 2:
+            menu.addAction("No other screens").setEnabled(False)
+        for screen in screens[1:]:
+            submenu = menu.addMenu(f"{screen.name()} ({screen.size().width()}x{screen.size().height()})")
+            group = QActionGroup(submenu)
+            for role, label in ROLES.items():
+                action = submenu.addAction(label)
+                action.setCheckable(True)
+                action.setChecked(self.role(screen) == role)
+                action.triggered.connect(lambda _, name=screen.name(), role=role: self.set_role(name, role))
+                group.addAction(action)
+        return menu
+
+def role_of(output: MirrorScreen | StageScreen) -> str:
+    return "stage" if isinstance(output, StageScreen) else "program"
+
+def place(output: OutputScreen, geometry: QRect, framed: bool):
+    # Changing the window flags hides the window, so only do it when they change
+    if framed != output.property("framed"):
+        output.setProperty("framed", framed)
+        if framed:
+            output.show_header()
+        else:
+            output.hide_header()
+    output.setGeometry(geometry)
+
+def init(window: QWidget, program: ShowScreen) -> DisplayManager:
+    manager = DisplayManager(window, program)
+    action_displays: QAction = window.findChild(QAction, "actionDisplays") # type: ignore
+    action_hide: QAction = window.findChild(QAction, "actionHide") # type: ignore
+    action_displays.triggered.connect(lambda: manager.menu().exec(QCursor.pos()))
+    action_hide.toggled.connect(manager.set_hidden)
+    return manager
@@ -0,0 +1,132 @@
+from collections.abc import Sequence
+from typing import Any
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QPersistentModelIndex, QSortFilterProxyModel, Qt
+from utils.text import fold_key
+from utils.trace import traced
+
+Index = QModelIndex | QPersistentModelIndex
+
+ID_ROLE = Qt.ItemDataRole.UserRole
+"""Book id of a book row, verse number of a verse row"""
+
+def format_verse(verse: int, text: str) -> str:
+    """Verse as listed and projected, "16.   For God so loved..." """
+    return f"{str(verse) + '.':<5} {text}"
+
+class BookListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.books: list = []
+        self.keys: list[str] = []
+        """Folded full name of every book, computed once per book list"""
+
+    @traced("models.set_books")
+    def set_books(self, books: list):
+        """books: list of BibleInfo"""
+        self.beginResetModel()
+        self.books = books
+        self.keys = [fold_key(book.get_full_name()) for book in books]
+        self.endResetModel()
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.books)
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        book = self.books[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return book.get_full_name()
+        if role == ID_ROLE:
+            return book.id
+        return None
+
+    def row_of(self, book_id: int) -> int:
+        rows = [i for i, book in enumerate(self.books) if book.id == book_id]
+        return rows[0] if len(rows) > 0 else -1
+
+class BookFilterModel(QSortFilterProxyModel):
+    """Case and accent insensitive substring filter over the book names, "zsoltar" lists "Zsoltárok" """
+    def __init__(self, source: BookListModel, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.key = ""
+        self.setSourceModel(source)
+
+    def set_text(self, text: str):
+        self.key = fold_key(text)
+        self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: Index) -> bool:
+        return self.key in self.source.keys[source_row]
+
+class ChapterListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.count = 0
+
+    @traced("models.set_count")
+    def set_count(self, count: int):
+        self.beginResetModel()
+        self.count = max(0, count)
+        self.endResetModel()
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.count
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if index.isValid() and role in (Qt.ItemDataRole.DisplayRole, ID_ROLE):
+            return str(index.row()+1) if role == Qt.ItemDataRole.DisplayRole else index.row()+1
+        return None
+
+class VerseListModel(QAbstractListModel):
+    """Verses of a chapter, formatted only when a row is painted"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.verses: Sequence[tuple[int, str]] = []
+
+    @traced("models.set_verses")
+    def set_verses(self, verses: Sequence[tuple[int, str]]):
+        self.beginResetModel()
+        self.verses = verses
+        self.endResetModel()
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.verses)
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        verse = self.verses[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return format_verse(verse[0], verse[1])
+        if role == ID_ROLE:
+            return verse[0]
+        return None
+
+class SongListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.songs: list = []
+
+    @traced("models.set_songs")
+    def set_songs(self, songs: list):
+        """songs: list of SongInfo"""
+        self.beginResetModel()
+        self.songs = songs
+        self.endResetModel()
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.songs)
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        song = self.songs[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return song.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return song.first_line
+        if role == ID_ROLE:
+            return song.id
+        return None
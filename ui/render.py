@@ -0,0 +1,206 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable
+from PySide6.QtCore import QRect, QRunnable, QThreadPool, Qt
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QImage, QPainter
+from utils.trace import traced
+
+MARGIN = 20
+FOOTER_PX = 40
+MIN_PX = 16
+READING_PX = 56
+"""Pixel size verse ranges are packed into slides at"""
+_WRAP = Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap
+
+FrameStyle = tuple[str, str, str]
+"""(background color, text color, font family)"""
+
+FrameKey = tuple[tuple[str, ...], str, int, int, float, FrameStyle]
+"""(texts, footer, width, height, device pixel ratio, style)"""
+
+StageKey = tuple[str, tuple[str, ...], str, tuple[str, ...], str, int, int, float, FrameStyle]
+"""("stage", texts, footer, next texts, next footer, width, height, device pixel ratio, style)"""
+
+NEXT_COLOR = "#ffd54f"
+
+def max_font_size(columns: int) -> int:
+    if columns <= 1:
+        return 80
+    return 60 if columns == 2 else 45
+
+@lru_cache(maxsize=1024)
+def fit_font_size(texts: tuple[str, ...], width: int, height: int, family: str, max_px: int) -> int:
+    """Largest pixel size at which every text fits its box when word wrapped, binary searched"""
+    def fits(px: int) -> bool:
+        font = QFont(family)
+        font.setPixelSize(px)
+        metrics = QFontMetrics(font)
+        for text in texts:
+            rect = metrics.boundingRect(QRect(0, 0, width, height), _WRAP, text)
+            if rect.width() > width or rect.height() > height:
+                return False
+        return True
+
+    low, high = MIN_PX, max_px
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+@lru_cache(maxsize=64)
+def font_metrics(family: str, px: int) -> QFontMetrics:
+    font = QFont(family)
+    font.setPixelSize(px)
+    return QFontMetrics(font)
+
+@lru_cache(maxsize=4096)
+def text_height(text: str, width: int, family: str, px: int) -> int:
+    """Height of the text word wrapped to width"""
+    return font_metrics(family, px).boundingRect(QRect(0, 0, width, 1 << 20), _WRAP, text).height()
+
+def pack_slides(texts: list[str], width: int, height: int, family: str, px: int = READING_PX) -> list[tuple[int, int]]:
+    """Split consecutive texts into (start, end) runs that fit a frame at the given pixel size
+
+    Every text is measured once, a text taller than the frame gets a slide of its own and is shrunk when shown"""
+    area_width = width - 2 * MARGIN
+    area_height = height - 3 * MARGIN - font_metrics(family, FOOTER_PX).height()
+    slides: list[tuple[int, int]] = []
+    start, used = 0, 0
+    for i, text in enumerate(texts):
+        needed = text_height(text, area_width, family, px)
+        if i > start and used + needed > area_height:
+            slides.append((start, i))
+            start, used = i, 0
+        used += needed
+    if start < len(texts):
+        slides.append((start, len(texts)))
+    return slides
+
+def _draw_texts(painter: QPainter, area: QRect, texts: tuple[str, ...], family: str, max_px: int):
+    if not texts or area.width() <= 0 or area.height() <= 0:
+        return
+    column_width = (area.width() - MARGIN * (len(texts) - 1)) // len(texts)
+    font = QFont(family)
+    font.setPixelSize(fit_font_size(texts, column_width, area.height(), family, max_px))
+    painter.setFont(font)
+    for i, text in enumerate(texts):
+        painter.drawText(QRect(area.left() + i * (column_width + MARGIN), area.top(), column_width, area.height()), _WRAP, text)
+
+@traced("render.render_frame")
+def render_frame(key: FrameKey) -> QImage:
+    """Paint texts side by side with the footer below, fonts shrunk to fit the screen"""
+    texts, footer, width, height, ratio, (background, color, family) = key
+    image = QImage(max(1, round(width * ratio)), max(1, round(height * ratio)), QImage.Format.Format_RGB32)
+    image.setDevicePixelRatio(ratio)
+    image.fill(QColor(background))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    painter.setPen(QColor(color))
+    area = QRect(0, 0, width, height).adjusted(MARGIN, MARGIN, -MARGIN, -MARGIN)
+
+    if footer:
+        font = QFont(family)
+        font.setPixelSize(FOOTER_PX)
+        painter.setFont(font)
+        footer_height = QFontMetrics(font).boundingRect(area, _WRAP, footer).height()
+        painter.drawText(QRect(area.left(), area.bottom() - footer_height + 1, area.width(), footer_height), _WRAP, footer)
+        area.setBottom(area.bottom() - footer_height - MARGIN)
+
+    _draw_texts(painter, area, texts, family, max_font_size(len(texts)))
+    painter.end()
+    return image
+
+@traced("render.render_stage")
+def render_stage(key: StageKey) -> QImage:
+    """Stage display: the projected text on top, the next verse or slide below it"""
+    _, texts, footer, next_texts, next_footer, width, height, ratio, (background, color, family) = key
+    image = QImage(max(1, round(width * ratio)), max(1, round(height * ratio)), QImage.Format.Format_RGB32)
+    image.setDevicePixelRatio(ratio)
+    image.fill(QColor(background))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    font = QFont(family)
+    font.setPixelSize(FOOTER_PX)
+    footer_height = QFontMetrics(font).height()
+
+    split = height * 3 // 5
+    painter.setPen(QColor(color))
+    painter.setFont(font)
+    painter.drawText(QRect(MARGIN, MARGIN, width - 2 * MARGIN, footer_height), Qt.AlignmentFlag.AlignLeft, footer)
+    _draw_texts(painter, QRect(MARGIN, MARGIN + footer_height, width - 2 * MARGIN, split - 2 * MARGIN - footer_height),
+                texts, family, max_font_size(len(texts)))
+
+    painter.fillRect(QRect(0, split, width, 2), QColor(NEXT_COLOR))
+    painter.setPen(QColor(NEXT_COLOR))
+    painter.setFont(font)
+    painter.drawText(QRect(MARGIN, split + MARGIN, width - 2 * MARGIN, footer_height), Qt.AlignmentFlag.AlignLeft,
+                     f"Next: {next_footer}" if next_texts else "")
+    _draw_texts(painter, QRect(MARGIN, split + MARGIN + footer_height, width - 2 * MARGIN, height - split - 2 * MARGIN - footer_height),
+                next_texts, family, max_font_size(len(next_texts)) * 2 // 3)
+    painter.end()
+    return image
+
+class FrameCache:
+    """Bounded LRU cache of rendered frames, shared with the pre-render threads
+
+    A full hd frame is about 8 MB, so only the frames around the current one are kept"""
+    def __init__(self, max_size: int = 8):
+        self.max_size = max_size
+        self._frames: OrderedDict[FrameKey | StageKey, QImage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: FrameKey | StageKey) -> QImage | None:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def put(self, key: FrameKey | StageKey, frame: QImage):
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_size:
+                self._frames.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def __contains__(self, key: FrameKey | StageKey) -> bool:
+        with self._lock:
+            return key in self._frames
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    def frame(self, key, render: Callable[..., QImage] = render_frame) -> QImage:
+        """Cached frame or a freshly rendered one | outputs of the same size and layout share one image"""
+        frame = self.get(key)
+        if frame is None:
+            frame = render(key)
+            self.put(key, frame)
+        return frame
+
+class FrameRenderer(QRunnable):
+    """Renders a frame off-screen so showing it later is a single paint"""
+    def __init__(self, cache: FrameCache, key: FrameKey):
+        super().__init__()
+        self.cache = cache
+        self.key = key
+
+    def run(self):
+        try:
+            if self.key not in self.cache:
+                self.cache.put(self.key, render_frame(self.key))
+        except Exception as e:
+            print(f"Pre-render failed: {e}")
+
+frame_cache = FrameCache()
+render_pool = QThreadPool()
+render_pool.setMaxThreadCount(1)
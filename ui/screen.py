@@ -1,55 +1,163 @@
-from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QApplication
+from typing import Callable
+from PySide6.QtWidgets import QWidget, QApplication
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QImage, QPainter, QColor
+from ui.render import FrameKey, FrameRenderer, FrameStyle, frame_cache, render_pool, render_stage
+from utils.trace import traced
 
 
-class ShowScreen(QWidget):
+class OutputScreen(QWidget):
+    """Window that paints one pre-rendered frame"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.bg_color = "black"
+        self.frame: QImage | None = None
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.frame is not None and self.frame.deviceIndependentSize().toSize() == self.size():
+            painter.drawImage(0, 0, self.frame)
+        else:
+            painter.fillRect(self.rect(), QColor(self.bg_color))
+        painter.end()
+
+    def show_header(self):
+        self.setWindowFlags(Qt.WindowType.Window)
+
+    def hide_header(self):
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
+
+class ShowScreen(OutputScreen):
+    """Projected output, every verse or slide is shown as one pre-rendered frame
+
+    It also holds what is projected and what comes next, the other outputs render from it"""
     def __init__(self, parent=None):
         super(ShowScreen, self).__init__(parent)
-        self.setStyleSheet("background-color: black;")
 
         self.isBlack = False
+        self.txt_color = "white"
+        self.font_family = self.font().family()
+
+        self.main_text = ""
+        self.footer_text = ""
+        self.column_texts: list[str] = []
+        """Parallel translations side by side, empty when a single text is shown"""
+        self.next_texts: list[str] = []
+        """The upcoming verse or slide, as last pre-rendered"""
+        self.next_footer = ""
+        self.on_shown: list[Callable[[], None]] = []
+        """Called after the projected text, the upcoming text or the black state changed"""
 
-        self.main_label = QLabel("", self)
-        self.main_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.main_label.setWordWrap(True)
-        self.main_label.setStyleSheet("color: white; font-size: 80px;")
+    def frame_style(self) -> FrameStyle:
+        return (self.bg_color, self.txt_color, self.font_family)
 
-        self.footer_label = QLabel("", self)
-        self.footer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.footer_label.setWordWrap(True)
-        self.footer_label.setStyleSheet("color: white; font-size: 40px;")
+    def texts(self) -> list[str]:
+        return self.column_texts or ([self.main_text] if self.main_text else [])
 
-        layout = QVBoxLayout(self)
-        layout.addWidget(self.main_label)
-        layout.addWidget(self.footer_label)
-        layout.setContentsMargins(20, 20, 20, 20)
-        layout.setStretch(0,1)
-        self.setLayout(layout)
+    def frame_key(self, texts: list[str], footer: str) -> FrameKey:
+        return (tuple(texts), footer, self.width(), self.height(), self.devicePixelRatioF(), self.frame_style())
 
+    @traced("screen.setText")
     def setText(self, main_text: str, footer:str = ""):
         if not self.isBlack:
-            self.main_label.setText(main_text)
-            self.footer_label.setText(footer)
+            self.main_text = main_text
+            self.footer_text = footer
+            self.column_texts = []
+            self.next_texts = []
+            self.show_frame()
+
+    @traced("screen.setColumns")
+    def setColumns(self, texts: list[str], footer: str = ""):
+        """Show several texts next to each other, eg. the same verse in more translations"""
+        if self.isBlack:
+            return
+        self.main_text = ""
+        self.footer_text = footer
+        self.column_texts = list(texts)
+        self.next_texts = []
+        self.show_frame()
+
+    def prerender(self, texts: list[str], footer: str = ""):
+        """Render an upcoming verse or slide in the background at the current size"""
+        self.next_texts = list(texts)
+        self.next_footer = footer
+        key = self.frame_key(texts, footer)
+        if key not in frame_cache:
+            render_pool.start(FrameRenderer(frame_cache, key))
+        self.notify()
+
+    def show_frame(self):
+        self.frame = frame_cache.frame(self.frame_key(self.texts(), self.footer_text))
+        self.update()
+        self.notify()
+
+    def resizeEvent(self, event):
+        self.show_frame()
+        super().resizeEvent(event)
+
+    def notify(self):
+        for callback in self.on_shown:
+            callback()
+
+    def state(self) -> dict:
+        """What is on the screen, as sent to remote viewers"""
+        return {"text": self.main_text, "footer": self.footer_text, "columns": self.column_texts, "black": self.isBlack}
+
+    def blank(self):
+        self.main_text = ""
+        self.column_texts = []
+        self.show_frame()
 
     def set_bg_color(self, color: str):
-        self.setStyleSheet(f"background-color: {color}")
+        self.bg_color = color
+        self.show_frame()
 
     def set_txt_color(self, color: str):
-        self.main_label.setStyleSheet(f"color: {color}")
+        self.txt_color = color
+        self.show_frame()
 
     def triggerBlack(self):
         if not self.isBlack:
             self.isBlack = True
-            self.main_label.clear()
+            self.blank()
         else:
             self.isBlack = False
-
-    def show_header(self):
-        self.setWindowFlags(Qt.WindowType.Window)
-
-    def hide_header(self):
-        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
+            self.notify()
+
+class MirrorScreen(OutputScreen):
+    """Another program output, a screen of the same size shows the very same frame"""
+    def __init__(self, source: ShowScreen, parent=None):
+        super().__init__(parent)
+        self.source = source
+
+    def refresh(self):
+        source = self.source
+        self.bg_color = source.bg_color
+        self.frame = frame_cache.frame((tuple(source.texts()), source.footer_text, self.width(), self.height(),
+                                        self.devicePixelRatioF(), source.frame_style()))
+        self.update()
+
+    def resizeEvent(self, event):
+        self.refresh()
+        super().resizeEvent(event)
+
+class StageScreen(OutputScreen):
+    """Confidence monitor for the stage: the projected text and the next one"""
+    def __init__(self, source: ShowScreen, parent=None):
+        super().__init__(parent)
+        self.source = source
+
+    def refresh(self):
+        source = self.source
+        key = ("stage", tuple(source.texts()), source.footer_text, tuple(source.next_texts), source.next_footer,
+               self.width(), self.height(), self.devicePixelRatioF(), ("black", "white", source.font_family))
+        self.frame = frame_cache.frame(key, render_stage)
+        self.update()
+
+    def resizeEvent(self, event):
+        self.refresh()
+        super().resizeEvent(event)
 
 
 
@@ -0,0 +1,64 @@
+import time
+from PySide6.QtWidgets import QWidget, QLabel
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QAction, QKeySequence, QFont
+from utils import trace
+from utils.file_manager import CACHE_DIR
+
+class TraceOverlay(QLabel):
+    """Span timings drawn over the main window while tracing is on"""
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 180); color: #7CFC00; padding: 6px;")
+        font = QFont("monospace")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+        self.message = ""
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active: bool):
+        trace.set_enabled(active)
+        self.setVisible(active)
+        if active:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        lines = [str(stats) for stats in trace.stats()] or ["Waiting for traced calls..."]
+        if self.message:
+            lines.append(self.message)
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - 10, 10)
+        self.raise_()
+
+    def dump(self):
+        path = trace.dump_chrome_trace(CACHE_DIR / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        self.message = f"Trace written to {path}"
+        if self.isVisible():
+            self.refresh()
+        else:
+            print(self.message)
+
+def install(window: QWidget) -> TraceOverlay:
+    """F12 toggles tracing with the overlay, Shift+F12 dumps the recorded spans"""
+    overlay = TraceOverlay(window)
+
+    action_trace = QAction("Trace", window)
+    action_trace.setCheckable(True)
+    action_trace.setShortcut(QKeySequence(Qt.Key.Key_F12))
+    action_trace.toggled.connect(overlay.set_active)
+    action_dump = QAction("Dump trace", window)
+    action_dump.setShortcut(QKeySequence(Qt.Modifier.SHIFT | Qt.Key.Key_F12))
+    action_dump.triggered.connect(overlay.dump)
+    window.addAction(action_trace)
+    window.addAction(action_dump)
+
+    action_trace.setChecked(trace.enabled)
+    return overlay
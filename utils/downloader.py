@@ -0,0 +1,104 @@
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+CHUNK_SIZE = 64 * 1024
+
+class DownloadJob:
+    def __init__(self, name: str, url: str, member: str, dest_dir: Path, on_done: Callable[[], None] | None = None):
+        self.name = name
+        self.url = url
+        self.member = member
+        """File extracted from the downloaded zip"""
+        self.dest_dir = Path(dest_dir)
+        self.on_done = on_done
+        self.received = 0
+        self.total = 0
+
+    @property
+    def part_path(self) -> Path:
+        return self.dest_dir / f"{self.name}.zip.part"
+
+def fetch(job: DownloadJob, on_chunk: Callable[[], None] = lambda: None, chunk_size: int = CHUNK_SIZE):
+    """Stream the url into job.part_path, resuming a previous partial file with an HTTP Range request"""
+    offset = job.part_path.stat().st_size if job.part_path.exists() else 0
+    request = Request(job.url)
+    if offset > 0:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urlopen(request)
+    except HTTPError as e:
+        if e.code == 416 and offset > 0:
+            # The partial file is already complete
+            job.received = job.total = offset
+            on_chunk()
+            return
+        raise
+    with response:
+        if response.status == 206:
+            job.received = offset
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            job.total = int(total) if total.isdigit() else 0
+            mode = "ab"
+        else:
+            job.received = 0
+            job.total = int(response.headers.get("Content-Length") or 0)
+            mode = "wb"
+        on_chunk()
+        with open(job.part_path, mode) as f:
+            while chunk := response.read(chunk_size):
+                f.write(chunk)
+                job.received += len(chunk)
+                on_chunk()
+    if job.total and job.received < job.total:
+        raise IOError(f"connection closed after {job.received} of {job.total} bytes")
+
+def extract(job: DownloadJob):
+    """Stream the member out of the archive next to it, then drop the archive"""
+    target = job.dest_dir / job.member
+    tmp_target = target.with_suffix(target.suffix + ".tmp")
+    try:
+        with zipfile.ZipFile(job.part_path) as archive:
+            with archive.open(job.member) as src, open(tmp_target, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    except zipfile.BadZipFile:
+        # Not worth resuming, start over on the next try
+        os.remove(job.part_path)
+        raise
+    os.replace(tmp_target, target)
+    os.remove(job.part_path)
+
+class DownloadEngine:
+    """Runs download jobs concurrently and reports the summed byte progress"""
+    def __init__(self, max_concurrent: int = 3, chunk_size: int = CHUNK_SIZE):
+        self.max_concurrent = max_concurrent
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def run(self, jobs: list[DownloadJob], on_progress: Callable[[int, int], None] = lambda received, total: None) -> dict[str, Exception]:
+        """Download, extract and finish every job | returns the errors of the failed jobs by name"""
+        def report():
+            with self._lock:
+                on_progress(sum(j.received for j in jobs), sum(j.total for j in jobs))
+
+        def work(job: DownloadJob):
+            job.dest_dir.mkdir(parents=True, exist_ok=True)
+            fetch(job, report, self.chunk_size)
+            extract(job)
+            if job.on_done is not None:
+                job.on_done()
+
+        errors: dict[str, Exception] = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrent)) as pool:
+            futures = {pool.submit(work, job): job for job in jobs}
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    errors[futures[future].name] = error
+        return errors
@@ -1,8 +1,22 @@
 import os
 from pathlib import Path
 
+DATA_DIR = Path(os.environ.get("PROJECTOR_DATA_DIR") or Path(__file__).parent.parent / "database")
+"""Root of the modules, caches and songs | PROJECTOR_DATA_DIR points it elsewhere, eg. for benchmarks"""
+BOOKS_DIR = DATA_DIR / "books"
+CACHE_DIR = DATA_DIR / "cache"
+SONGS_PATH = DATA_DIR / "songs.SQLite3"
+PLAYLISTS_DIR = DATA_DIR / "playlists"
+HISTORY_PATH = DATA_DIR / "history.json"
+SESSION_PATH = DATA_DIR / "session.json"
+
 def find_books() -> list[str]:
-    """Find sql databases in database/books | returns their name without extension"""
-    path = Path(__file__).parent.parent / "database" / "books"
-    files = os.listdir(path)
-    return [f.split(".")[0] for f in files]
\ No newline at end of file
+    """List sql databases in database/books | returns their name without extension
+
+    Unvalidated, use the module catalog of database.bible for the installed modules"""
+    files = os.listdir(BOOKS_DIR)
+    return [f.removesuffix(".SQLite3") for f in files if f.endswith(".SQLite3")]
+
+def book_path(name: str) -> Path:
+    """Path of the MyBible module with the given name"""
+    return BOOKS_DIR / f"{name}.SQLite3"
@@ -0,0 +1,31 @@
+import re
+import unicodedata
+from collections.abc import Iterator
+from functools import lru_cache
+
+_TAG = re.compile(r"<[^>]*>|\[[^\]]*\]")
+_MARKUP = re.compile(r"\s*(?:(?:<[^>]*>|\[[^\]]*\])\s*)+|\s{2,}")
+_WORD = re.compile(r"\w+")
+
+def _collapse(match: re.Match) -> str:
+    whitespace = _TAG.sub("", match.group())
+    return whitespace if len(whitespace) < 2 else " "
+
+def clean_verse_text(text: str) -> str:
+    """Strip MyBible markup (html tags, [notes]) and collapse whitespace in a single pass"""
+    return _MARKUP.sub(_collapse, text).strip()
+
+def fold(text: str) -> str:
+    """Case and accent insensitive key, so "janos" matches "János" """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+@lru_cache(maxsize=4096)
+def fold_key(text: str) -> str:
+    """Cached fold for the short strings matched again and again: book names, titles, the typed filter"""
+    return fold(text)
+
+def tokens(text: str) -> Iterator[str]:
+    """Folded words of a text, one at a time | the terms FTS5's unicode61 tokenizer indexes for Latin script text"""
+    for match in _WORD.finditer(fold(text)):
+        yield match.group()
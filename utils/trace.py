@@ -0,0 +1,101 @@
+"""Timing spans for the projection hot path
+
+Disabled by default, a traced call then costs one flag check. Enable with PROJECTOR_TRACE=1
+or F12 in the main window, Shift+F12 writes a Chrome trace (chrome://tracing, ui.perfetto.dev).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+enabled = os.environ.get("PROJECTOR_TRACE", "") not in ("", "0")
+
+MAX_EVENTS = 100_000
+WINDOW = 512
+"""Samples kept per span name for the rolling percentiles"""
+
+_events: deque[tuple[str, int, int, int]] = deque(maxlen=MAX_EVENTS)
+"""(name, start ns, duration ns, thread id)"""
+_samples: dict[str, deque[int]] = {}
+_counts: dict[str, int] = {}
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()
+
+def set_enabled(value: bool):
+    global enabled
+    enabled = value
+
+def record(name: str, start: int, end: int):
+    duration = end - start
+    _events.append((name, start, duration, threading.get_ident()))
+    samples = _samples.get(name)
+    if samples is None:
+        with _lock:
+            samples = _samples.setdefault(name, deque(maxlen=WINDOW))
+    samples.append(duration)
+    _counts[name] = _counts.get(name, 0) + 1
+
+def traced(name: str):
+    """Decorator timing every call of the function as a span"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
+
+@contextmanager
+def span(name: str):
+    """Time a block, eg. a part of a longer function"""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter_ns())
+
+class Stats:
+    def __init__(self, name: str, count: int, samples: list[int]):
+        samples = sorted(samples)
+        self.name = name
+        self.count = count
+        """Calls since the last reset, the percentiles only cover the last WINDOW of them"""
+        self.p50_ms = samples[len(samples) // 2] / 1e6
+        self.p99_ms = samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e6
+        self.max_ms = samples[-1] / 1e6
+
+    def __str__(self) -> str:
+        return f"{self.name:<28} {self.count:>6}  p50 {self.p50_ms:7.2f}  p99 {self.p99_ms:7.2f}  max {self.max_ms:7.2f} ms"
+
+def stats() -> list[Stats]:
+    with _lock:
+        names = list(_samples)
+    return [Stats(name, _counts.get(name, 0), list(_samples[name])) for name in sorted(names) if _samples[name]]
+
+def reset():
+    with _lock:
+        _events.clear()
+        _samples.clear()
+        _counts.clear()
+
+def dump_chrome_trace(path: Path) -> Path:
+    """Write the recorded spans as complete ("X") events of the Chrome trace format"""
+    pid = os.getpid()
+    events = [{"name": name, "ph": "X", "ts": (start - _origin) / 1000, "dur": duration / 1000, "pid": pid, "tid": tid}
+              for name, start, duration, tid in list(_events)]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return path